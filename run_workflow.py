@@ -3,6 +3,7 @@ import sys
 
 sys.path.insert(0, os.getcwd())
 
+from src.config import Config
 from src.ingestion.pipeline import IngestionPipeline
 from src.retrieval.hybrid_search import HybridSearch
 
@@ -12,7 +13,7 @@ print("=" * 70)
 
 try:
     pipeline = IngestionPipeline()
-    result = pipeline.run("d:/rag/data/docs")
+    result = pipeline.run(Config.DOCS_DIR)
 
     print(f"\nProcessed: {result['processed_files']} files")
     print(f"Total chunks: {result['total_chunks']}")
@@ -29,13 +30,16 @@ try:
     searcher = HybridSearch()
     queries = ["python programming", "algorithms", "functions"]
 
+    # Buffer output and write once instead of a locked print per result
+    lines = []
     for query in queries:
-        print(f"\nQuery: '{query}'")
+        lines.append(f"\nQuery: '{query}'\n")
         results = searcher.search(query, k=2)
         for i, (doc, meta) in enumerate(results, 1):
-            print(
-                f"  #{i} (Score: {meta.get('rrf_score', 0):.4f}): {doc.page_content[:60]}..."
+            lines.append(
+                f"  #{i} (Score: {meta.get('rrf_score', 0):.4f}): {doc.page_content[:60]}...\n"
             )
+    sys.stdout.write("".join(lines))
 
 except Exception as e:
     print(f"Error: {e}")
@@ -1,102 +1,293 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, FastAPI, Request, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import shutil
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import asyncio
+import io
+import json
 import os
+import shutil
+import time
 import uuid
 
+import anyio
+
 # Core Modules
+from src.config import Config
 from src.ingestion.pipeline import IngestionPipeline
 from src.retrieval.hybrid_search import HybridSearch
-from src.generation.llm import LLMClient
+from src.retrieval.rerank import Reranker
+from src.retrieval.post_processing import PostProcessor
+from src.generation.llm import LLMClient, LLMBatcher
+from src.generation.cache import SemanticCache
 from src.generation.prompts import PromptManager
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-# Initialize Singletons
-try:
-    ingest_pipeline = IngestionPipeline()
-    search_engine = HybridSearch()
-    llm_client = LLMClient()
-    logger.info("API Services Initialized.")
-except Exception as e:
-    logger.critical(f"Failed to initialize API services: {e}")
-    raise e
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initializes the service singletons once per worker at startup and
+    shares them through app.state (models are not loaded at import time).
+    """
+    try:
+        app.state.ingest_pipeline = IngestionPipeline()
+        app.state.search_engine = HybridSearch()
+        # Share the search engine's loaded embedding model
+        app.state.embedder = app.state.search_engine.store.embedder
+        app.state.reranker = Reranker()
+        app.state.llm_client = LLMClient()
+        # Coalesces concurrent LLM calls into one dispatch per flush window
+        app.state.llm_batcher = LLMBatcher(app.state.llm_client)
+        # Answers for near-identical questions (cosine >= 0.95)
+        app.state.answer_cache = SemanticCache()
+        logger.info("API Services Initialized.")
+    except Exception as e:
+        logger.critical(f"Failed to initialize API services: {e}")
+        raise e
+
+    # Model inference (embedder, reranker) is serialized so bursts queue instead of
+    # thrashing the GPU; CPU-side retrieval (Chroma, BM25) may still overlap
+    app.state.gpu_limiter = anyio.CapacityLimiter(1)
+    app.state.cpu_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+
+    app.state.llm_batcher.start()
+    yield
+    await app.state.llm_batcher.stop()
+
+# Upload copy chunk size (1 MiB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Background ingestion jobs: session_id -> Task
+ingest_jobs: Dict[str, asyncio.Task] = {}
+# Finished jobs: session_id -> time.monotonic() at completion (oldest first).
+# Kept for status polling until they expire or the cap is exceeded
+ingest_finished_at: Dict[str, float] = {}
+INGEST_JOB_TTL_SECONDS = 3600
+MAX_FINISHED_INGEST_JOBS = 256
+# Pipeline run + BM25 refresh mutate shared state, so jobs run one at a time
+ingest_lock = asyncio.Lock()
 
 class QueryRequest(BaseModel):
     question: str
     k: int = 5
 
-@router.post("/ingest/")
-async def ingest_file(file: UploadFile = File(...)):
+def _save_upload(upload: UploadFile, file_path: Path):
+    """
+    Persists an uploaded file to disk.
+    Uses os.sendfile (kernel-side copy) when the upload has a real file
+    descriptor, falling back to a buffered copy otherwise.
+    """
+    src = upload.file
+    src.seek(0)
+    with open(file_path, "wb") as buffer:
+        if hasattr(os, "sendfile"):
+            try:
+                # A SpooledTemporaryFile moves an in-memory spool to disk here;
+                # a plain in-memory stream raises io.UnsupportedOperation
+                src_fd = src.fileno()
+                dst_fd = buffer.fileno()
+                offset = 0
+                while True:
+                    sent = os.sendfile(dst_fd, src_fd, offset, UPLOAD_CHUNK_SIZE)
+                    if sent == 0:
+                        return
+                    offset += sent
+            except (OSError, io.UnsupportedOperation) as e:
+                logger.debug(f"sendfile unavailable ({e}), using buffered copy")
+                src.seek(0)
+                buffer.seek(0)
+                buffer.truncate()
+
+        shutil.copyfileobj(src, buffer, UPLOAD_CHUNK_SIZE)
+
+async def _run_ingest(app: FastAPI, temp_dir: Path) -> Dict[str, Any]:
+    """Runs the ingestion pipeline and refreshes the search index off the event loop."""
+    async with ingest_lock:
+        stats = await asyncio.to_thread(app.state.ingest_pipeline.run, temp_dir)
+
+        # Refresh Search Index (Rebuild BM25)
+        await asyncio.to_thread(app.state.search_engine.refresh)
+        # Cached answers may be stale against the new corpus
+        app.state.answer_cache.clear()
+
+    # Cleanup (Optional: Keep for debug, or remove)
+    # shutil.rmtree(temp_dir)
+
+    logger.info(f"Background ingestion finished for {temp_dir}")
+    return stats
+
+def _prune_ingest_jobs():
+    """Drops finished jobs past the TTL, and the oldest ones beyond the cap."""
+    cutoff = time.monotonic() - INGEST_JOB_TTL_SECONDS
+    while ingest_finished_at:
+        session_id, finished_at = next(iter(ingest_finished_at.items()))
+        if finished_at >= cutoff and len(ingest_finished_at) <= MAX_FINISHED_INGEST_JOBS:
+            break
+        del ingest_finished_at[session_id]
+        ingest_jobs.pop(session_id, None)
+
+def _on_ingest_done(session_id: str, temp_dir: Path, task: asyncio.Task):
+    """
+    Logs the job outcome (retrieving the exception, so failures are reported
+    even if nobody polls the status endpoint) and schedules its expiry.
+    """
+    if task.cancelled():
+        logger.warning(f"Background ingestion cancelled for {temp_dir}")
+    elif task.exception() is not None:
+        logger.error(f"Background ingestion failed for {temp_dir}: {task.exception()}")
+
+    ingest_finished_at[session_id] = time.monotonic()
+    _prune_ingest_jobs()
+
+@router.post("/ingest/", status_code=202)
+async def ingest_file(request: Request, file: UploadFile = File(...)):
     """
-    Uploads a file and runs the ingestion pipeline on it.
+    Uploads a file and schedules the ingestion pipeline on it.
+    Poll /ingest/status/{session_id} for the result (kept for an hour after it finishes).
     """
     logger.info(f"Received file upload: {file.filename}")
     try:
         # Create temp unique directory to avoid collisions
         session_id = str(uuid.uuid4())
-        temp_dir = os.path.join(os.getcwd(), "data", "temp", session_id)
-        os.makedirs(temp_dir, exist_ok=True)
+        temp_dir = Config.TEMP_DIR / session_id
+        temp_dir.mkdir(parents=True, exist_ok=True)
         
-        file_path = os.path.join(temp_dir, file.filename)
+        file_path = temp_dir / file.filename
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # The upload must be persisted before the request closes it
+        await asyncio.to_thread(_save_upload, file, file_path)
             
-        logger.info(f"File saved to {file_path}. Starting ingestion...")
-        
-        # Run ingestion
-        ingest_pipeline.run(temp_dir)
-        
-        # Refresh Search Index (Rebuild BM25)
-        search_engine.refresh()
+        logger.info(f"File saved to {file_path}. Scheduling ingestion...")
         
-        # Cleanup (Optional: Keep for debug, or remove)
-        # shutil.rmtree(temp_dir)
+        task = asyncio.create_task(_run_ingest(request.app, temp_dir))
+        task.add_done_callback(partial(_on_ingest_done, session_id, temp_dir))
+        ingest_jobs[session_id] = task
+        _prune_ingest_jobs()
         
         return {
-            "message": f"Successfully ingested {file.filename}",
-            "session_id": session_id
+            "message": f"Ingestion started for {file.filename}",
+            "session_id": session_id,
+            "status": "running"
         }
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/ingest/status/{session_id}")
+async def ingest_status(session_id: str):
+    """
+    Reports the state of a background ingestion job.
+    """
+    task = ingest_jobs.get(session_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session_id: {session_id}")
+
+    if not task.done():
+        return {"session_id": session_id, "status": "running"}
+    if task.cancelled():
+        return {"session_id": session_id, "status": "cancelled"}
+    if task.exception() is not None:
+        return {"session_id": session_id, "status": "failed", "error": str(task.exception())}
+
+    return {"session_id": session_id, "status": "completed", "result": task.result()}
+
+@router.post("/refresh/")
+async def refresh_index(request: Request):
+    """
+    Reloads the BM25 index from ChromaDB (a no-op when the corpus is unchanged).
+    """
+    services = request.app.state
+    try:
+        # Serialized with ingestion jobs, which refresh the same index
+        async with ingest_lock:
+            rebuilt = await asyncio.to_thread(services.search_engine.refresh)
+            if rebuilt:
+                # Cached answers may be stale against the new corpus
+                services.answer_cache.clear()
+        return {
+            "status": "ok",
+            "rebuilt": rebuilt,
+            "documents": len(services.search_engine.docs_map),
+        }
+    except Exception as e:
+        logger.error(f"Index refresh failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _retrieve(services, question: str, k: int):
+    """
+    Hybrid Search -> Rerank -> Reorder for one question.
+    Returns the question embedding (shared with the semantic cache) and the final docs.
+    """
+    # 0. Embed the question once (shared by retrieval and the semantic cache)
+    # Run model/BM25 work in worker threads so it doesn't stall the event loop
+    q_emb = await anyio.to_thread.run_sync(
+        services.embedder.embed_query, question, limiter=services.gpu_limiter
+    )
+
+    # 1. Hybrid Search (fetch 2k candidates for reranking)
+    candidates = await anyio.to_thread.run_sync(
+        partial(services.search_engine.search_with_embedding, q_emb, question, k=k * 2),
+        limiter=services.cpu_limiter,
+    )
+
+    # 2. Rerank (bounded top-k heap) -> Reorder
+    reranked = await anyio.to_thread.run_sync(
+        services.reranker.rerank,
+        question,
+        [doc for doc, _ in candidates],
+        k,
+        limiter=services.gpu_limiter,
+    )
+    return q_emb, PostProcessor.reorder(reranked)
+
+def _format_results(final_docs) -> List[Dict[str, Any]]:
+    return [
+        {
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "domain": doc.metadata.get('domain', 'unknown')
+        }
+        for doc in final_docs
+    ]
+
+def _build_system_prompt(final_docs) -> str:
+    # Bounded by the LLM context window
+    context_str = PromptManager.build_context(doc.page_content for doc in final_docs)
+    # Detect domain from first doc or default
+    domain = final_docs[0].metadata.get('domain', 'general') if final_docs else "general"
+    return PromptManager.build_prompt(context_str, domain=domain)
+
+def _sse(data: Any, event: Optional[str] = None) -> str:
+    """Formats one Server-Sent Event with a JSON payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @router.post("/search/")
-async def search_documents(request: QueryRequest):
+async def search_documents(request: Request, query: QueryRequest):
     """
     Performs Hybrid Search -> Rerank -> Generation.
     """
-    logger.info(f"Search request: '{request.question}'")
+    logger.info(f"Search request: '{query.question}'")
+    services = request.app.state
     try:
-        # 1. Hybrid Search
-        candidates = search_engine.search(request.question, k=request.k * 2) # Fetch more for reranking
-        
-        # 2. Rerank (Placeholder/Simple for now, can enable full Reranker if dependencies ready)
-        # For now, let's take top k from candidates
-        final_docs = candidates[:request.k]
-        
-        response_data = []
-        context_parts = []
-        
-        for doc in final_docs:
-            response_data.append({
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "domain": doc.metadata.get('domain', 'unknown')
-            })
-            context_parts.append(doc.page_content)
+        q_emb, final_docs = await _retrieve(services, query.question, query.k)
+        response_data = _format_results(final_docs)
             
-        # 3. Generate Answer
-        logger.info("Generating answer with LLM...")
-        context_str = "\n\n".join(context_parts)
-        # Detect domain from first doc or default
-        domain = final_docs[0].metadata.get('domain', 'general') if final_docs else "general"
-        
-        system_prompt = PromptManager.build_prompt(context_str, domain=domain)
-        answer = llm_client.generate(system_prompt, request.question)
+        # 3. Generate Answer (semantic cache first)
+        answer = services.answer_cache.lookup(q_emb)
+        if answer is not None:
+            logger.info("Semantic cache hit, skipping LLM call")
+        else:
+            logger.info("Generating answer with LLM...")
+            system_prompt = _build_system_prompt(final_docs)
+            answer = await services.llm_batcher.submit(system_prompt, query.question)
+            services.answer_cache.store(q_emb, answer)
             
         return {
             "answer": answer,
@@ -106,3 +297,44 @@ async def search_documents(request: QueryRequest):
     except Exception as e:
         logger.error(f"Search API failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search/stream/")
+async def search_documents_stream(request: Request, query: QueryRequest):
+    """
+    Same pipeline as /search/, streamed as Server-Sent Events:
+    one "sources" event with the results, "data" events carrying answer
+    tokens as they are generated, then a "done" event.
+    """
+    logger.info(f"Streaming search request: '{query.question}'")
+    services = request.app.state
+    try:
+        q_emb, final_docs = await _retrieve(services, query.question, query.k)
+    except Exception as e:
+        logger.error(f"Search API failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_stream():
+        yield _sse({"count": len(final_docs), "results": _format_results(final_docs)}, event="sources")
+
+        answer = services.answer_cache.lookup(q_emb)
+        if answer is not None:
+            logger.info("Semantic cache hit, skipping LLM call")
+            yield _sse(answer)
+        else:
+            logger.info("Streaming answer from LLM...")
+            # Streamed calls go straight to the client; only whole answers are batched
+            parts = []
+            try:
+                async for token in services.llm_client.generate_stream(
+                    _build_system_prompt(final_docs), query.question
+                ):
+                    parts.append(token)
+                    yield _sse(token)
+            except Exception as e:
+                logger.error(f"Answer streaming failed: {e}")
+                yield _sse(str(e), event="error")
+                return
+            services.answer_cache.store(q_emb, "".join(parts))
+        yield _sse(None, event="done")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,8 +9,25 @@ class Config:
     # Paths relative to the project root (assuming running from root)
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     CHROMA_DB_DIR = os.path.join(BASE_DIR, "data", "chroma_db")
+    # Persisted BM25 indexes, one subdirectory per corpus fingerprint
+    BM25_CACHE_DIR = os.path.join(CHROMA_DB_DIR, "bm25")
+    # Precomputed so request handlers don't rebuild paths per call
+    DATA_DIR = Path(BASE_DIR) / "data"
+    TEMP_DIR = DATA_DIR / "temp"
+    DOCS_DIR = DATA_DIR / "docs"
+    CACHE_DIR = DATA_DIR / "cache"
+    # Parsed loader output, keyed by file content hash
+    LOADER_CACHE_DIR = CACHE_DIR / "loader"
+    # Chunk embeddings, keyed by content hash + model
+    EMBEDDING_CACHE_PATH = CACHE_DIR / "embeddings.sqlite"
     
     EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+    # ONNX file used when embedding on CPU (ONNX Runtime backend).
+    # Point at an INT8 export, e.g. "onnx/model_qint8_avx512_vnni.onnx", for VNNI kernels.
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model.onnx")
     CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    # Seconds LLMBatcher waits for more requests once several are already
+    # queued together (a lone request is always sent immediately)
+    LLM_BATCH_FLUSH_INTERVAL = float(os.getenv("LLM_BATCH_FLUSH_INTERVAL", "0.02"))
     
     DOMAINS = ["programming", "system_design", "iot", "web_development", "ml_ai", "data_science"]
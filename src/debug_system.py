@@ -5,18 +5,19 @@ import shutil
 # Setup Paths
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.config import Config
 from src.ingestion.pipeline import IngestionPipeline
 from src.ingestion.vector_store import ChromaStore
 from src.retrieval.hybrid_search import HybridSearch
 
 def debug_run():
     print("--- 1. Setup Debug Data ---")
-    debug_dir = os.path.join("d:/rag/data/debug_temp")
+    debug_dir = Config.DATA_DIR / "debug_temp"
     if os.path.exists(debug_dir):
         shutil.rmtree(debug_dir)
     os.makedirs(debug_dir)
     
-    file_path = os.path.join(debug_dir, "space_exploration.txt")
+    file_path = debug_dir / "space_exploration.txt"
     with open(file_path, "w") as f:
         f.write("SpaceX uses the Starship rocket for Mars colonization missions. It is fully reusable.")
     print(f"Created file: {file_path}")
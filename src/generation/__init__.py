@@ -1,3 +1,4 @@
-from .llm import LLMClient
+from .llm import LLMClient, LLMBatcher
 from .prompts import PromptManager
 from .memory import MemoryManager
+from .cache import SemanticCache
@@ -0,0 +1,59 @@
+from typing import List, Optional, Sequence
+import numpy as np
+
+class SemanticCache:
+    """
+    In-memory semantic cache of LLM answers keyed by question embedding.
+    Embeddings are already L2-normalized, so cosine similarity against every
+    cached question is a single matrix-vector product.
+    """
+    
+    def __init__(self, capacity: int = 1024, threshold: float = 0.95):
+        self.capacity = capacity
+        self.threshold = threshold
+        # Allocated on first store, once the embedding dimension is known
+        self._embeddings: Optional[np.ndarray] = None
+        self._answers: List[Optional[str]] = [None] * capacity
+        # Logical clock per slot for LRU eviction
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self._size = 0
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[str]:
+        """Returns the cached answer of the most similar question, if above threshold."""
+        if self._size == 0:
+            return None
+        
+        query = np.asarray(embedding, dtype=np.float32)
+        sims = self._embeddings[:self._size] @ query
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        
+        self._touch(best)
+        return self._answers[best]
+
+    def store(self, embedding: Sequence[float], answer: str):
+        query = np.asarray(embedding, dtype=np.float32)
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+        
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            # Evict least recently used
+            slot = int(np.argmin(self._last_used))
+        
+        self._embeddings[slot] = query
+        self._answers[slot] = answer
+        self._touch(slot)
+
+    def clear(self):
+        self._answers = [None] * self.capacity
+        self._last_used[:] = 0
+        self._size = 0
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+from typing import AsyncIterator, List, Optional, Set, Tuple
 
 # Ensure root import if run directly
 try:
@@ -8,7 +10,7 @@ except ModuleNotFoundError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
     from src.config import Config
 
-from groq import Groq
+from groq import AsyncGroq
 
 class LLMClient:
     def __init__(self):
@@ -16,11 +18,12 @@ class LLMClient:
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found in Config")
             
-        self.client = Groq(api_key=self.api_key)
+        # Async client so concurrent requests overlap network latency
+        self.client = AsyncGroq(api_key=self.api_key)
         self.model = "llama3-70b-8192" 
 
-    def generate(self, system_prompt: str, user_query: str) -> str:
-        completion = self.client.chat.completions.create(
+    async def generate(self, system_prompt: str, user_query: str) -> str:
+        completion = await self.client.chat.completions.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -30,3 +33,124 @@ class LLMClient:
             max_tokens=1024
         )
         return completion.choices[0].message.content
+
+    async def generate_stream(self, system_prompt: str, user_query: str) -> AsyncIterator[str]:
+        """Same as generate(), but yields the answer text as tokens arrive."""
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ],
+            temperature=0,
+            max_tokens=1024,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class LLMBatcher:
+    """
+    Coalesces concurrent generation requests.
+    A request that arrives alone is dispatched at once. When several are
+    already queued, they are taken together, plus any arriving within
+    `flush_interval` seconds, and dispatched as a single asyncio.gather
+    over the shared AsyncGroq client.
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        flush_interval: float = Config.LLM_BATCH_FLUSH_INTERVAL,
+        max_batch_size: int = 16,
+    ):
+        self.llm_client = llm_client
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references so in-flight batches aren't garbage collected
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Starts the collector task on the running event loop (idempotent)."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """
+        Stops the collector task. Batches already dispatched still complete;
+        requests still waiting in the queue fail with RuntimeError.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending)
+
+    async def submit(self, system_prompt: str, user_query: str) -> str:
+        """Queues a request and waits for its answer."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((system_prompt, user_query, future))
+        return await future
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, str, asyncio.Future]]):
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("LLM batcher stopped"))
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Take whatever is already waiting, without yielding
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                # Only wait for stragglers when requests are actually arriving together
+                if len(batch) > 1 and self.flush_interval > 0:
+                    deadline = loop.time() + self.flush_interval
+                    while len(batch) < self.max_batch_size:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+            except asyncio.CancelledError:
+                # Stopped mid-collection; don't leave these callers waiting
+                self._fail(batch)
+                raise
+
+            # Dispatch without blocking collection of the next batch
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        results = await asyncio.gather(
+            *(self.llm_client.generate(system_prompt, user_query) for system_prompt, user_query, _ in batch),
+            return_exceptions=True
+        )
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue  # Caller went away
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
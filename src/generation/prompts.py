@@ -1,3 +1,6 @@
+import io
+from typing import Iterable
+
 class PromptManager:
     
     SYSTEM_TEMPLATE = """
@@ -11,6 +14,40 @@ class PromptManager:
     {context}
     """
     
+    # Context budget for llama3-70b-8192 (~8K tokens at ~3-4 chars/token,
+    # leaving room for the prompt and the answer)
+    MAX_CONTEXT_CHARS = 24000
+    
+    # Template halves around {context}; the domain only appears in the head
+    _HEAD, _TAIL = SYSTEM_TEMPLATE.split("{context}")
+    # Rendered head per domain, so build_prompt never re-parses the template
+    _PREFIXES = {}
+    
+    @classmethod
+    def _prefix(cls, domain: str) -> str:
+        prefix = cls._PREFIXES.get(domain)
+        if prefix is None:
+            prefix = cls._PREFIXES[domain] = cls._HEAD.format(domain=domain)
+        return prefix
+    
     @staticmethod
     def build_prompt(context_str: str, domain: str = "general") -> str:
-        return PromptManager.SYSTEM_TEMPLATE.format(context=context_str, domain=domain)
+        return PromptManager._prefix(domain) + context_str + PromptManager._TAIL
+    
+    @staticmethod
+    def build_context(chunks: Iterable[str], max_chars: int = MAX_CONTEXT_CHARS) -> str:
+        """Joins chunks with blank lines, stopping once max_chars is reached."""
+        buf = io.StringIO()
+        remaining = max_chars
+        sep = ""
+        for chunk in chunks:
+            if len(sep) + len(chunk) > remaining:
+                if remaining > len(sep):
+                    buf.write(sep)
+                    buf.write(chunk[:remaining - len(sep)])
+                break
+            buf.write(sep)
+            buf.write(chunk)
+            remaining -= len(sep) + len(chunk)
+            sep = "\n\n"
+        return buf.getvalue()
@@ -1,8 +1,11 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+import numpy as np
 import torch
 import os
 import sys
 import time
+from typing import Optional
 
 # Add root to sys.path to ensure absolute imports work if run as script
 try:
@@ -18,8 +21,16 @@ except ModuleNotFoundError:
 logger = get_logger(__name__)
 
 
-class Embedder:
-    """Manages the Embedding Model (BGE-Small) with GPU support."""
+class Embedder(Embeddings):
+    """
+    Manages the Embedding Model (BGE-Small) with GPU support.
+    Encodes through SentenceTransformer directly (FP16 on CUDA) and doubles
+    as the LangChain embedding function, so Chroma shares the same model.
+    """
+
+    # Encode batch sizes; the GPU size is halved on CUDA OOM
+    GPU_BATCH_SIZE = 256
+    CPU_BATCH_SIZE = 32
 
     def __init__(self):
         # Config.EMBEDDING_MODEL should be "BAAI/bge-small-en-v1.5"
@@ -28,29 +39,37 @@ class Embedder:
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         if self.device == "cuda":
             logger.info(f"GPU detected: {torch.cuda.get_device_name(0)}")
+            self.batch_size = self.GPU_BATCH_SIZE
         else:
             logger.info("Using CPU for embeddings (slower)")
+            self.batch_size = self.CPU_BATCH_SIZE
 
-        self._embedding_function = None
+        self._model = None
         self.embedding_dim = None
+        # Identifies the exact weights/backend producing the vectors (see get_model_id)
+        self.model_id = None
 
-    def get_function(self) -> HuggingFaceEmbeddings:
-        """Returns the LangChain embedding function for Chroma integration."""
-        if self._embedding_function is None:
+    def _get_model(self) -> SentenceTransformer:
+        """Lazily loads the SentenceTransformer model."""
+        if self._model is None:
             try:
                 logger.info(
                     f"Loading Embedding Model: {self.model_name} on {self.device}..."
                 )
-                self._embedding_function = HuggingFaceEmbeddings(
-                    model_name=self.model_name,
-                    model_kwargs={"device": self.device},
-                    encode_kwargs={
-                        "normalize_embeddings": True
-                    },  # BGE recommends normalization
-                )
-                # Get embedding dimension by embedding a test string
-                test_embedding = self._embedding_function.embed_query("test")
-                self.embedding_dim = len(test_embedding)
+                model = None
+                if self.device == "cpu":
+                    model = self._load_onnx_model()
+                if model is not None:
+                    self.model_id = f"{self.model_name}|onnx:{Config.EMBEDDING_ONNX_FILE}|float32"
+                else:
+                    model = SentenceTransformer(self.model_name, device=self.device)
+                    self.model_id = f"{self.model_name}|torch|float32"
+                if self.device == "cuda":
+                    # FP16 halves activation bytes and runs on tensor cores
+                    model.half()
+                    self.model_id = f"{self.model_name}|torch|float16"
+                self._model = model
+                self.embedding_dim = model.get_sentence_embedding_dimension()
                 logger.info(
                     f"Embedding Model loaded successfully. Dimension: {self.embedding_dim}"
                 )
@@ -59,51 +78,117 @@ class Embedder:
                 raise EmbeddingError(
                     f"Model load failed: {self.model_name}", detail=str(e)
                 )
-        return self._embedding_function
+        return self._model
+
+    def _load_onnx_model(self) -> Optional[SentenceTransformer]:
+        """
+        Loads the model on ONNX Runtime (fused kernels, INT8/VNNI if the file is quantized).
+        Returns None when the backend or the ONNX file is unavailable.
+        """
+        try:
+            model = SentenceTransformer(
+                self.model_name,
+                device="cpu",
+                backend="onnx",
+                model_kwargs={"file_name": Config.EMBEDDING_ONNX_FILE},
+            )
+            logger.info(f"Using ONNX Runtime backend ({Config.EMBEDDING_ONNX_FILE})")
+            return model
+        except Exception as e:
+            logger.warning(f"ONNX Runtime backend unavailable, using PyTorch on CPU: {e}")
+            return None
+
+    def get_function(self) -> Embeddings:
+        """Returns the LangChain embedding function for Chroma integration."""
+        self._get_model()
+        return self
+
+    def get_model_id(self) -> str:
+        """
+        Returns the model name plus backend, ONNX file and dtype. Vectors from
+        different backends or quantizations differ slightly, so caches key on this.
+        """
+        if self.model_id is None:
+            self._get_model()
+        return self.model_id
 
     def get_embedding_dimension(self) -> int:
         """Returns the embedding vector dimension."""
         if self.embedding_dim is None:
-            self.get_function()  # Initialize if not done yet
+            self._get_model()  # Initialize if not done yet
         return self.embedding_dim
 
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Encodes texts in batches of self.batch_size into one float32 array.
+        On CUDA OOM the batch size is halved (and kept) before retrying.
+        """
+        model = self._get_model()
+        batches = []
+        i = 0
+        while i < len(texts):
+            batch = texts[i : i + self.batch_size]
+            try:
+                vectors = model.encode(
+                    batch,
+                    batch_size=len(batch),
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,  # BGE recommends normalization
+                    show_progress_bar=False,
+                )
+            except torch.cuda.OutOfMemoryError:
+                if self.batch_size == 1:
+                    raise
+                torch.cuda.empty_cache()
+                self.batch_size //= 2
+                logger.warning(
+                    f"CUDA OOM while embedding, reducing batch size to {self.batch_size}"
+                )
+                continue
+            batches.append(vectors)
+            i += len(batch)
+        return np.concatenate(batches).astype(np.float32, copy=False)
+
     def embed_query(self, text: str) -> list[float]:
         """Embeds a single query string."""
         start_time = time.time()
-        embedding = self.get_function().embed_query(text)
+        embedding = self._encode([text])[0].tolist()
         elapsed = time.time() - start_time
         logger.debug(f"Query embedding completed in {elapsed:.3f}s")
         return embedding
 
-    def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        """Embeds a list of documents/chunks with validation."""
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Embeds a list of documents/chunks into a (n, dim) float32 array with validation."""
         if not texts:
             logger.warning("No texts provided for embedding")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
 
         try:
             start_time = time.time()
-            embeddings = self.get_function().embed_documents(texts)
+            embeddings = self._encode(texts)
             elapsed = time.time() - start_time
 
-            # Validate all embeddings have same dimension
-            if embeddings:
-                dims = set(len(e) for e in embeddings)
-                if len(dims) > 1:
-                    logger.warning(f"Inconsistent embedding dimensions: {dims}")
-                    raise EmbeddingError(
-                        "Inconsistent dimensions in embeddings", detail=f"Dims: {dims}"
-                    )
-
-                logger.debug(
-                    f"Embedded {len(embeddings)} documents in {elapsed:.3f}s (avg: {elapsed/len(embeddings):.3f}s per doc)"
+            # Validate all embeddings have same dimension (a ragged result can't form a 2D array)
+            if embeddings.ndim != 2 or embeddings.shape[0] != len(texts):
+                logger.warning(f"Inconsistent embedding shape: {embeddings.shape}")
+                raise EmbeddingError(
+                    "Inconsistent dimensions in embeddings",
+                    detail=f"Shape: {embeddings.shape}",
                 )
 
+            logger.debug(
+                f"Embedded {len(embeddings)} documents in {elapsed:.3f}s (avg: {elapsed/len(embeddings):.3f}s per doc)"
+            )
+
             return embeddings
         except Exception as e:
             logger.error(f"Failed to embed documents: {e}")
             raise EmbeddingError("Document embedding failed", detail=str(e))
 
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """LangChain interface: same as encode(), converted to lists for Chroma."""
+        return self.encode(texts).tolist()
+
 
 if __name__ == "__main__":
     # Test Block
@@ -1,16 +1,17 @@
 import os
 import sys
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 
 # Ensure root import if run directly
 try:
+    from src.config import Config
     from src.ingestion.preprocess import Preprocessor
     from src.ingestion.vector_store import ChromaStore
     from src.utils.logging import get_logger
     from src.utils.exception import IngestionError
 except ModuleNotFoundError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.config import Config
     from src.ingestion.preprocess import Preprocessor
     from src.ingestion.vector_store import ChromaStore
     from src.utils.logging import get_logger
@@ -32,8 +33,12 @@ class IngestionPipeline:
         ".c",
         ".h",
     }
+    # Lowercase suffix tuple for a single C-level str.endswith check
+    _SUFFIX_TUPLE = tuple(SUPPORTED_EXTENSIONS)
     # Max file size in MB
     MAX_FILE_SIZE_MB = 50
+    # Worker processes for per-file preprocessing (CPU-bound, so one per core)
+    MAX_WORKERS = os.cpu_count() or 1
 
     def __init__(self):
         self.preprocessor = Preprocessor()
@@ -64,66 +69,68 @@ class IngestionPipeline:
 
         all_chunks = []
 
-        # 1. Processing Phase
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                fpath = os.path.join(root, file)
-
-                # Check file extension
-                if not self._is_supported_file(fpath):
-                    logger.debug(f"Skipping unsupported file: {file}")
-                    continue
-
-                # Check file size
-                if not self._check_file_size(fpath):
-                    logger.warning(f"File too large, skipping: {file}")
-                    stats["files_failed"].append(
-                        {"file": file, "reason": "File too large"}
-                    )
-                    stats["failed_files"] += 1
-                    continue
-
-                stats["total_files"] += 1
-
-                try:
-                    logger.debug(f"Processing: {file}")
-                    file_chunks = self.preprocessor.process_file(fpath)
-
-                    # Validate chunks
-                    if not file_chunks:
-                        logger.warning(f"File produced no chunks: {file}")
-                        stats["files_failed"].append(
-                            {"file": file, "reason": "No chunks produced"}
-                        )
-                        stats["failed_files"] += 1
-                        continue
-
-                    # Validate each chunk has metadata and content
-                    valid_chunks = [
-                        c
-                        for c in file_chunks
-                        if c.metadata and len(c.page_content.strip()) > 0
-                    ]
-                    if len(valid_chunks) < len(file_chunks):
-                        logger.warning(
-                            f"File {file}: {len(file_chunks) - len(valid_chunks)} invalid chunks removed"
-                        )
-
-                    if valid_chunks:
-                        all_chunks.extend(valid_chunks)
-                        stats["processed_files"] += 1
-                        stats["files_processed"].append(
-                            {"file": file, "chunks": len(valid_chunks)}
-                        )
-                        logger.info(f"Processed {file}: {len(valid_chunks)} chunks")
-
-                except Exception as e:
-                    logger.error(f"Skipping file {file} due to error: {e}")
-                    stats["files_failed"].append({"file": file, "reason": str(e)})
-                    stats["failed_files"] += 1
-                    continue
-
-        # 2. Storage Phase
+        # 1. Discovery Phase
+        candidates = []
+        for fpath, size_bytes in self._collect_files(folder_path):
+            file = os.path.basename(fpath)
+
+            # Check file extension
+            if not self._is_supported_file(fpath):
+                logger.debug(f"Skipping unsupported file: {file}")
+                continue
+
+            # Check file size
+            if not self._check_file_size(fpath, size_bytes):
+                logger.warning(f"File too large, skipping: {file}")
+                stats["files_failed"].append(
+                    {"file": file, "reason": "File too large"}
+                )
+                stats["failed_files"] += 1
+                continue
+
+            stats["total_files"] += 1
+            candidates.append(fpath)
+
+        # 2. Processing Phase (files are independent, so preprocess them in parallel)
+        for fpath, file_chunks, error in self.preprocessor.process_files(
+            candidates, max_workers=self.MAX_WORKERS
+        ):
+            file = os.path.basename(fpath)
+            if error is not None:
+                logger.error(f"Skipping file {file} due to error: {error}")
+                stats["files_failed"].append({"file": file, "reason": error})
+                stats["failed_files"] += 1
+                continue
+
+            # Validate chunks
+            if not file_chunks:
+                logger.warning(f"File produced no chunks: {file}")
+                stats["files_failed"].append(
+                    {"file": file, "reason": "No chunks produced"}
+                )
+                stats["failed_files"] += 1
+                continue
+
+            # Validate each chunk has metadata and content
+            valid_chunks = [
+                c
+                for c in file_chunks
+                if c.metadata and len(c.page_content.strip()) > 0
+            ]
+            if len(valid_chunks) < len(file_chunks):
+                logger.warning(
+                    f"File {file}: {len(file_chunks) - len(valid_chunks)} invalid chunks removed"
+                )
+
+            if valid_chunks:
+                all_chunks.extend(valid_chunks)
+                stats["processed_files"] += 1
+                stats["files_processed"].append(
+                    {"file": file, "chunks": len(valid_chunks)}
+                )
+                logger.info(f"Processed {file}: {len(valid_chunks)} chunks")
+
+        # 3. Storage Phase
         if all_chunks:
             logger.info(f"Total chunks to ingest: {len(all_chunks)}")
             try:
@@ -146,14 +153,28 @@ class IngestionPipeline:
         )
         return stats
 
+    def _collect_files(self, folder_path: str) -> Iterator[Tuple[str, int]]:
+        """
+        Recursively yields (file_path, size_bytes) for every file under folder_path.
+        os.scandir entries carry the file type (and on Windows the stat) from the
+        directory listing, avoiding a separate stat call per file.
+        """
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._collect_files(entry.path)
+                elif entry.is_file():
+                    yield entry.path, entry.stat().st_size
+
     def _is_supported_file(self, file_path: str) -> bool:
         """Checks if file extension is supported."""
-        ext = Path(file_path).suffix.lower()
-        return ext in self.SUPPORTED_EXTENSIONS
+        return file_path.lower().endswith(self._SUFFIX_TUPLE)
 
-    def _check_file_size(self, file_path: str) -> bool:
+    def _check_file_size(self, file_path: str, size_bytes: Optional[int] = None) -> bool:
         """Checks if file size is within limits."""
-        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        if size_bytes is None:
+            size_bytes = os.path.getsize(file_path)
+        size_mb = size_bytes / (1024 * 1024)
         if size_mb > self.MAX_FILE_SIZE_MB:
             logger.warning(
                 f"File {file_path} is {size_mb:.1f}MB (max: {self.MAX_FILE_SIZE_MB}MB)"
@@ -161,8 +182,10 @@ class IngestionPipeline:
             return False
         return True
 
+
+if __name__ == "__main__":
     # Test
-    data_path = "d:/rag/data/docs"
+    data_path = str(Config.DOCS_DIR)
     # Ensure dummy data exists for test
     if not os.path.exists(data_path):
         os.makedirs(data_path, exist_ok=True)
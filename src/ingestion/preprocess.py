@@ -1,28 +1,44 @@
+import hashlib
 import os
 import re
-from typing import List, Dict, Any
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from enum import Enum
 import time
 
 try:
-    from src.utils.logging import get_logger
+    from src.config import Config
+    from src.utils.logging import get_logger, init_worker_logging, LOG_FILE_PATH
     from src.utils.exception import IngestionError
+    from src.utils.workers import get_worker_context
 except ModuleNotFoundError:
     import sys
 
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-    from src.utils.logging import get_logger
+    from src.config import Config
+    from src.utils.logging import get_logger, init_worker_logging, LOG_FILE_PATH
     from src.utils.exception import IngestionError
+    from src.utils.workers import get_worker_context
 
 logger = get_logger(__name__)
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import (
-    PDFPlumberLoader,
-    TextLoader,
-    UnstructuredMarkdownLoader,
-    UnstructuredFileLoader,
-)
+# Optional keyword matchers, fastest first: Hyperscan, then Aho-Corasick, then regex
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+import diskcache
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+# Heavier loaders (pdfium, pdfplumber, unstructured) are imported in the branch that uses them
+from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document as LangchainDocument
 
 
@@ -41,19 +57,125 @@ class Domain(Enum):
 class TextCleaner:
     """Handles text cleaning and noise removal."""
 
+    _NULL_BYTES = str.maketrans("", "", "\x00")
+    # Email addresses | phone numbers | URLs, removed in one pass
+    _NOISE = re.compile(
+        r"[\w.\-]+@[\w.\-]+\.\w+"
+        r"|\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"
+        r"|https?://\S+"
+    )
+    _WHITESPACE = re.compile(r"\s+")
+    # Layout-preserving variants for source code
+    _TRAILING_WHITESPACE = re.compile(r"[ \t\r\f\v]+$", re.MULTILINE)
+    _BLANK_LINES = re.compile(r"\n{3,}")
+
     @staticmethod
-    def clean(text: str) -> str:
+    def clean(text: str, keep_layout: bool = False) -> str:
+        """
+        Removes null bytes, emails, phone numbers and URLs, then collapses
+        whitespace. With keep_layout (source code), newlines and indentation
+        are kept so language-aware splitters can find class/def boundaries;
+        only trailing whitespace and runs of blank lines are trimmed.
+        """
         # Remove null bytes
-        text = text.replace("\x00", "")
-        # Remove email addresses
-        text = re.sub(r"[\w\.-]+@[\w\.-]+\.\w+", "", text)
-        # Remove phone numbers
-        text = re.sub(r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b", "", text)
-        # Remove URLs
-        text = re.sub(r"https?://\S+", "", text)
-        # Remove excessive whitespace
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        text = text.translate(TextCleaner._NULL_BYTES)
+        # Remove emails, phone numbers and URLs
+        text = TextCleaner._NOISE.sub("", text)
+        if keep_layout:
+            text = TextCleaner._TRAILING_WHITESPACE.sub("", text)
+            return TextCleaner._BLANK_LINES.sub("\n\n", text).strip("\n")
+        # Remove excessive whitespace (after noise removal, so gaps collapse too)
+        return TextCleaner._WHITESPACE.sub(" ", text).strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _select_keyword_hits(text: str, hits: Iterable[Tuple[int, int, str]]) -> Iterator[str]:
+    """
+    Applies DomainDetector's matching rule to raw automaton hits, which
+    report every occurrence of every keyword: keeps hits on word boundaries,
+    then takes them leftmost-longest without overlap, as re.finditer does
+    over DomainDetector._PATTERN. Hits are (start, end, word), end exclusive.
+    """
+    last_end = 0
+    for start, end, word in sorted(hits, key=lambda hit: (hit[0], -hit[1])):
+        if start < last_end:
+            continue
+        # \b holds where the word character class changes
+        before = start > 0 and _is_word_char(text[start - 1])
+        after = end < len(text) and _is_word_char(text[end])
+        if before == _is_word_char(word[0]) or after == _is_word_char(word[-1]):
+            continue
+        last_end = end
+        yield word
+
+
+def _build_automaton(keywords: Dict[Domain, List[str]]):
+    """Builds one Aho-Corasick automaton over every domain keyword."""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for domain, kws in keywords.items():
+        for kw in kws:
+            # Keywords are written as regex fragments (e.g. "c\+\+")
+            word = kw.replace("\\", "")
+            automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_hyperscan(keywords: Dict[Domain, List[str]]):
+    """
+    Compiles every domain keyword into one Hyperscan database. Word boundaries
+    are part of each expression and start offsets are reported leftmost, so
+    hits only need an overlap sweep (see DomainDetector._hyperscan_counts).
+    Returns (database, expression id -> keyword), or (None, None).
+    """
+    if hyperscan is None:
+        return None, None
+
+    # Keywords are written as regex fragments (e.g. "c\+\+")
+    words = [kw.replace("\\", "") for kws in keywords.values() for kw in kws]
+    # Hyperscan's \b is ASCII-only and means something else next to a non-word
+    # character, so it is only used on word-character edges; the other cases
+    # are checked on the hit
+    expressions = [
+        (
+            (r"\b" if _is_word_char(word[0]) else "")
+            + re.escape(word)
+            + (r"\b" if _is_word_char(word[-1]) else "")
+        ).encode()
+        for word in words
+    ]
+
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions),
+        )
+    except Exception as e:
+        logger.warning(f"Hyperscan compile failed, using fallback matcher: {e}")
+        return None, None
+    return database, words
+
+
+def _on_byte_boundary(data: bytes, start: int, end: int, word: str) -> bool:
+    """
+    The \b rule of _select_keyword_hits for a hit at UTF-8 byte offsets,
+    decoding only the characters on either side of it.
+    """
+    # The slices may cut a character in half; "ignore" drops the partial bytes
+    before_char = data[max(start - 4, 0) : start].decode("utf-8", "ignore")[-1:]
+    after_char = data[end : end + 4].decode("utf-8", "ignore")[:1]
+    before = bool(before_char) and _is_word_char(before_char)
+    after = bool(after_char) and _is_word_char(after_char)
+    return before != _is_word_char(word[0]) and after != _is_word_char(word[-1])
 
 
 class DomainDetector:
@@ -135,50 +257,214 @@ class DomainDetector:
         ],
     }
 
+    # Keyword literal -> domain name (keywords are written as regex fragments, e.g. "c\+\+")
+    _KEYWORD_DOMAINS = {
+        kw.replace("\\", ""): domain.name for domain, kws in KEYWORDS.items() for kw in kws
+    }
+
+    # Matching rule shared by every backend: keywords must sit on \b boundaries,
+    # and matches are leftmost-longest without overlap ("loss function" is one
+    # ML_AI hit, not also a PROGRAMMING "function"). Longest-first alternation
+    # gives exactly that with re.finditer
+    _PATTERN = re.compile(
+        r"\b(?:"
+        + "|".join(re.escape(word) for word in sorted(_KEYWORD_DOMAINS, key=len, reverse=True))
+        + r")\b"
+    )
+
+    _AUTOMATON = _build_automaton(KEYWORDS)
+    _HS_DATABASE, _HS_WORDS = _build_hyperscan(KEYWORDS)
+    # Hyperscan scratch space must not be shared between threads
+    _hs_local = threading.local()
+
+    @staticmethod
+    def _hyperscan_counts(text_lower: str) -> Counter:
+        scratch = getattr(DomainDetector._hs_local, "scratch", None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(DomainDetector._HS_DATABASE)
+            DomainDetector._hs_local.scratch = scratch
+
+        data = text_lower.encode("utf-8")
+        hits = []
+
+        def on_match(expr_id, start, end, flags, context):
+            hits.append((start, end, expr_id))
+
+        # One pass over the UTF-8 bytes; the database already enforces ASCII
+        # word boundaries, so hits are mostly final
+        DomainDetector._HS_DATABASE.scan(data, match_event_handler=on_match, scratch=scratch)
+
+        words = DomainDetector._HS_WORDS
+        # Offsets stay in bytes (keywords are ASCII). Only hits next to a
+        # non-ASCII byte, or on a keyword's non-word edge ("c++"), need the
+        # full boundary check
+        size = len(data)
+        counts = Counter()
+        last_end = 0
+        for start, end, expr_id in sorted(hits, key=lambda hit: (hit[0], -hit[1])):
+            if start < last_end:
+                continue
+            word = words[expr_id]
+            if (
+                (start > 0 and data[start - 1] > 0x7F)
+                or (end < size and data[end] > 0x7F)
+                or not _is_word_char(word[0])
+                or not _is_word_char(word[-1])
+            ) and not _on_byte_boundary(data, start, end, word):
+                continue
+            last_end = end
+            counts[DomainDetector._KEYWORD_DOMAINS[word]] += 1
+        return counts
+
+    @staticmethod
+    def _automaton_counts(text_lower: str) -> Counter:
+        # Single O(n) automaton pass; boundaries and overlaps resolved afterwards
+        hits = (
+            (end - len(word) + 1, end + 1, word)
+            for end, word in DomainDetector._AUTOMATON.iter(text_lower)
+        )
+        return Counter(
+            DomainDetector._KEYWORD_DOMAINS[word]
+            for word in _select_keyword_hits(text_lower, hits)
+        )
+
+    @staticmethod
+    def _regex_counts(text_lower: str) -> Counter:
+        # Single pass over the text, tallied by the matched keyword's domain
+        return Counter(
+            DomainDetector._KEYWORD_DOMAINS[m.group()]
+            for m in DomainDetector._PATTERN.finditer(text_lower)
+        )
+
     @staticmethod
     def detect(text: str) -> Domain:
         text_lower = text.lower()
-        scores = {domain: 0 for domain in Domain}
-
-        for domain, keywords in DomainDetector.KEYWORDS.items():
-            for kw in keywords:
-                # Use word boundaries for more accurate matching
-                pattern = r"\b" + kw + r"\b"
-                matches = re.findall(pattern, text_lower)
-                scores[domain] += len(matches)
 
-        best_domain = max(scores, key=scores.get)
-        return best_domain if scores[best_domain] > 0 else Domain.GENERAL
+        # Every backend applies the same matching rule (see _PATTERN)
+        if DomainDetector._HS_DATABASE is not None:
+            # One DFA pass over the UTF-8 bytes
+            counts = DomainDetector._hyperscan_counts(text_lower)
+        elif DomainDetector._AUTOMATON is not None:
+            counts = DomainDetector._automaton_counts(text_lower)
+        else:
+            counts = DomainDetector._regex_counts(text_lower)
+
+        if not counts:
+            return Domain.GENERAL
+
+        # Ties resolve in Domain declaration order
+        return max(
+            (domain for domain in Domain if domain.name in counts),
+            key=lambda domain: counts[domain.name],
+        )
 
 
 class Chunker:
     """Splits text based on domain rules."""
 
-    @staticmethod
-    def split(doc: LangchainDocument, domain: Domain) -> List[LangchainDocument]:
-        # Domain-specific config
-        config = {
-            Domain.PROGRAMMING: {"chunk_size": 350, "chunk_overlap": 50},
-            Domain.DSA: {"chunk_size": 600, "chunk_overlap": 100},
-            Domain.SYSTEM_DESIGN: {"chunk_size": 900, "chunk_overlap": 150},
-            Domain.IOT: {"chunk_size": 500, "chunk_overlap": 100},
-            Domain.WEB_DEV: {"chunk_size": 400, "chunk_overlap": 80},
-            Domain.ML_AI: {"chunk_size": 400, "chunk_overlap": 50},
-            Domain.GEN_AI: {"chunk_size": 450, "chunk_overlap": 60},
-            Domain.DATA_SCIENCE: {"chunk_size": 400, "chunk_overlap": 50},
-            Domain.GENERAL: {"chunk_size": 500, "chunk_overlap": 100},
-        }
-
-        params = config.get(domain, config[Domain.GENERAL])
-
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=params["chunk_size"],
-            chunk_overlap=params["chunk_overlap"],
-            separators=["\n\n", "\n", ".", " ", ""],
-        )
+    # Domain-specific config
+    CONFIG = {
+        Domain.PROGRAMMING: {"chunk_size": 350, "chunk_overlap": 50},
+        Domain.DSA: {"chunk_size": 600, "chunk_overlap": 100},
+        Domain.SYSTEM_DESIGN: {"chunk_size": 900, "chunk_overlap": 150},
+        Domain.IOT: {"chunk_size": 500, "chunk_overlap": 100},
+        Domain.WEB_DEV: {"chunk_size": 400, "chunk_overlap": 80},
+        Domain.ML_AI: {"chunk_size": 400, "chunk_overlap": 50},
+        Domain.GEN_AI: {"chunk_size": 450, "chunk_overlap": 60},
+        Domain.DATA_SCIENCE: {"chunk_size": 400, "chunk_overlap": 50},
+        Domain.GENERAL: {"chunk_size": 500, "chunk_overlap": 100},
+    }
+
+    # Source files split on language syntax (classes, functions) instead of prose
+    LANGUAGES = {
+        ".py": Language.PYTHON,
+        ".js": Language.JS,
+        ".java": Language.JAVA,
+        ".cpp": Language.CPP,
+        ".c": Language.C,
+        ".h": Language.C,
+    }
 
-        cols = splitter.split_documents([doc])
-        return cols
+    # Post-pass: merge neighbours when one of them is below MIN_CHUNK_CHARS,
+    # as long as the merged chunk stays within 1.15x the target size
+    OVERSIZE_FACTOR = 1.15
+    MIN_CHUNK_CHARS = 100
+
+    # One splitter per (domain, language), built on first use (splitters are stateless per call)
+    _SPLITTERS: Dict[Tuple[Domain, Optional[Language]], RecursiveCharacterTextSplitter] = {}
+
+    @classmethod
+    def _get_splitter(
+        cls, domain: Domain, language: Optional[Language] = None
+    ) -> RecursiveCharacterTextSplitter:
+        splitter = cls._SPLITTERS.get((domain, language))
+        if splitter is None:
+            params = cls.CONFIG.get(domain, cls.CONFIG[Domain.GENERAL])
+            if language is not None:
+                splitter = RecursiveCharacterTextSplitter.from_language(
+                    language=language,
+                    chunk_size=params["chunk_size"],
+                    chunk_overlap=params["chunk_overlap"],
+                    add_start_index=True,
+                )
+            else:
+                splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=params["chunk_size"],
+                    chunk_overlap=params["chunk_overlap"],
+                    separators=["\n\n", "\n", ".", " ", ""],
+                    add_start_index=True,
+                )
+            cls._SPLITTERS[(domain, language)] = splitter
+        return splitter
+
+    @classmethod
+    def split(cls, doc: LangchainDocument, domain: Domain) -> List[LangchainDocument]:
+        language = cls.LANGUAGES.get(doc.metadata.get("ext"))
+        splitter = cls._get_splitter(domain, language)
+        params = cls.CONFIG.get(domain, cls.CONFIG[Domain.GENERAL])
+
+        chunks = cls._regularize(
+            doc.page_content,
+            splitter.split_documents([doc]),
+            max_size=int(cls.OVERSIZE_FACTOR * params["chunk_size"]),
+        )
+        # start_index is only needed for merging; keep it out of stored metadata
+        for chunk in chunks:
+            chunk.metadata.pop("start_index", None)
+        return chunks
+
+    @classmethod
+    def _regularize(
+        cls,
+        text: str,
+        chunks: List[LangchainDocument],
+        max_size: int,
+    ) -> List[LangchainDocument]:
+        """
+        Merge post-pass over the splitter output (which already keeps every
+        chunk within chunk_size): greedily merges neighbouring chunks that are
+        each under MIN_CHUNK_CHARS, while the result fits in max_size. Merged
+        text is sliced from the source by start_index, so the overlap between
+        the two isn't duplicated.
+        """
+        merged = []
+        for chunk in chunks:
+            if merged:
+                prev = merged[-1]
+                start = prev.metadata.get("start_index", -1)
+                chunk_start = chunk.metadata.get("start_index", -1)
+                if (
+                    start >= 0
+                    and chunk_start >= 0
+                    and max(len(prev.page_content), len(chunk.page_content)) < cls.MIN_CHUNK_CHARS
+                ):
+                    end = chunk_start + len(chunk.page_content)
+                    if start < end and end - start <= max_size:
+                        prev.page_content = text[start:end]
+                        continue
+            merged.append(chunk)
+
+        return merged
 
 
 class MetadataMerger:
@@ -205,22 +491,134 @@ class MetadataMerger:
 class FileLoader:
     """Universal File Loader."""
 
+    # Parsed documents are cached on disk (4 GiB cap), so re-ingesting an
+    # unchanged file skips parsing; opened lazily once per process
+    CACHE_SIZE_LIMIT = 2**32
+    _cache = None
+    _cache_pid = None
+
+    @classmethod
+    def _get_cache(cls) -> diskcache.Cache:
+        if cls._cache is None or cls._cache_pid != os.getpid():
+            cls._cache = diskcache.Cache(
+                str(Config.LOADER_CACHE_DIR), size_limit=cls.CACHE_SIZE_LIMIT
+            )
+            cls._cache_pid = os.getpid()
+        return cls._cache
+
     @staticmethod
-    def load(file_path: str) -> List[LangchainDocument]:
+    def _cache_key(file_path: str, ext: str) -> str:
+        """
+        Keys on file content rather than path: uploads land in a fresh temp
+        directory each time, so the same document never has the same path.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return f"{ext}:{digest.hexdigest()}"
+
+    @classmethod
+    def load(cls, file_path: str) -> List[LangchainDocument]:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         ext = os.path.splitext(file_path)[1].lower()
 
+        # The cache is an optimization only; any failure falls through to parsing
+        key = None
+        try:
+            key = cls._cache_key(file_path, ext)
+            cached = cls._get_cache().get(key)
+        except Exception as e:
+            logger.warning(f"Loader cache unavailable: {e}")
+            cached = None
+
+        if cached is not None:
+            logger.debug(f"Loader cache hit: {file_path}")
+            docs = []
+            for text, metadata in cached:
+                # Point path fields at the current copy of the file
+                for field in ("source", "file_path"):
+                    if field in metadata:
+                        metadata[field] = file_path
+                docs.append(LangchainDocument(page_content=text, metadata=metadata))
+            return docs
+
+        docs = cls._parse(file_path, ext)
+        # Lets the chunker pick a language-aware splitter for source files
+        for doc in docs:
+            doc.metadata["ext"] = ext
+
+        if docs and key is not None:
+            try:
+                # Stored as plain (text, metadata) tuples, not pickled Document objects
+                cls._get_cache().set(
+                    key, [(doc.page_content, doc.metadata) for doc in docs]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache parsed {file_path}: {e}")
+
+        return docs
+
+    @staticmethod
+    def _load_pdf(file_path: str) -> List[LangchainDocument]:
+        """
+        Extracts PDF text page by page with PDFium (native C++).
+        Pages are read sequentially: PDFium is not thread-safe, so pypdfium2
+        serializes calls and a thread pool would only add contention.
+        Falls back to PDFPlumber when no page yields any text.
+        """
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            total_pages = len(pdf)
+            docs = []
+            for i in range(total_pages):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+                docs.append(
+                    LangchainDocument(
+                        page_content=text,
+                        metadata={
+                            "source": file_path,
+                            "file_path": file_path,
+                            "page": i,
+                            "total_pages": total_pages,
+                        },
+                    )
+                )
+        finally:
+            pdf.close()
+
+        if not any(doc.page_content.strip() for doc in docs):
+            logger.info(f"PDFium found no text in {file_path}, retrying with PDFPlumber")
+            from langchain_community.document_loaders import PDFPlumberLoader
+
+            return PDFPlumberLoader(file_path).load()
+        return docs
+
+    @staticmethod
+    def _parse(file_path: str, ext: str) -> List[LangchainDocument]:
         try:
             if ext == ".pdf":
-                loader = PDFPlumberLoader(file_path)
+                return FileLoader._load_pdf(file_path)
             elif ext == ".md":
+                from langchain_community.document_loaders import UnstructuredMarkdownLoader
+
                 loader = UnstructuredMarkdownLoader(file_path)
             elif ext in [".txt", ".py", ".js", ".java", ".cpp", ".c", ".h"]:
                 loader = TextLoader(file_path, autodetect_encoding=True)
             else:
                 # Fallback for other types
+                from langchain_community.document_loaders import UnstructuredFileLoader
+
                 loader = UnstructuredFileLoader(file_path)
 
             return loader.load()
@@ -229,6 +627,19 @@ class FileLoader:
             return []
 
 
+def _process_file_worker(
+    preprocessor: "Preprocessor", file_path: str
+) -> Tuple[List[LangchainDocument], Optional[str]]:
+    """
+    Runs Preprocessor.process_file in a worker process.
+    Errors are returned as strings so nothing unpicklable crosses the process boundary.
+    """
+    try:
+        return preprocessor.process_file(file_path), None
+    except Exception as e:
+        return [], str(e)
+
+
 class Preprocessor:
     """Facade for the preprocessing pipeline."""
 
@@ -252,8 +663,11 @@ class Preprocessor:
 
             for doc in raw_docs:
                 try:
-                    # 2. Clean
-                    cleaned_text = self.cleaner.clean(doc.page_content)
+                    # 2. Clean (source files keep their line structure for the splitter)
+                    cleaned_text = self.cleaner.clean(
+                        doc.page_content,
+                        keep_layout=doc.metadata.get("ext") in Chunker.LANGUAGES,
+                    )
                     doc.page_content = cleaned_text
 
                     # 3. Detect Domain
@@ -287,29 +701,36 @@ class Preprocessor:
             logger.error(f"Critical error processing file {file_path}: {e}")
             raise IngestionError(f"Failed to process file {file_path}", detail=str(e))
 
-
-if __name__ == "__main__":
-    # Test Block
-    print("Testing Preprocessor...")
-
-    # 1. Create a dummy file
-    test_dir = "d:/rag/data/test"
-    os.makedirs(test_dir, exist_ok=True)
-    test_file = os.path.join(test_dir, "test_algo.txt")
-
-    with open(test_file, "w") as f:
-        f.write("fine tune")
-
-    # 2. Run Processor
-    processor = Preprocessor()
-    try:
-        chunks = processor.process_file(test_file)
-        print(f"\nSuccessfully processed '{test_file}'.")
-        print(f"Detected Domain: {chunks[0].metadata['domain']}")
-        print(f"Total Chunks: {len(chunks)}")
-        print(f"Sample Chunk Content: {chunks[0].page_content}")
-    except Exception as e:
-        print(f"Error: {e}")
+    def process_files(
+        self, file_paths: List[str], max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[str, List[LangchainDocument], Optional[str]]]:
+        """
+        Processes many files in parallel worker processes (cleaning, domain
+        detection and chunking are CPU-bound Python, so threads would serialize
+        on the GIL).
+        Yields (file_path, chunks, error) in input order; error is None on success.
+        """
+        if not file_paths:
+            return
+
+        # A single file isn't worth the process start-up cost
+        if len(file_paths) == 1:
+            yield (file_paths[0], *_process_file_worker(self, file_paths[0]))
+            return
+
+        workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_worker_context(),
+            initializer=init_worker_logging,
+            initargs=(LOG_FILE_PATH,),
+        ) as executor:
+            futures = [
+                executor.submit(_process_file_worker, self, fpath)
+                for fpath in file_paths
+            ]
+            for fpath, future in zip(file_paths, futures):
+                yield (fpath, *future.result())
 
 
 if __name__ == "__main__":
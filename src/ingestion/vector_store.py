@@ -2,12 +2,14 @@ import os
 import shutil
 import hashlib
 from typing import List, Optional
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
 try:
     from src.config import Config
     from src.ingestion.embedding import Embedder
+    from src.utils.embedding_cache import EmbeddingCache
     from src.utils.logging import get_logger
     from src.utils.exception import VectorStoreError
 except ModuleNotFoundError:
@@ -16,6 +18,7 @@ except ModuleNotFoundError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
     from src.config import Config
     from src.ingestion.embedding import Embedder
+    from src.utils.embedding_cache import EmbeddingCache
     from src.utils.logging import get_logger
     from src.utils.exception import VectorStoreError
 
@@ -28,10 +31,27 @@ class ChromaStore:
     Stores: Chunks (Text), Vectors (Embeddings), Metadata, and Unique IDs.
     """
 
+    # Documents embedded + written per collection.add call
+    ADD_BATCH_SIZE = 512
+    # HNSW settings. Chroma applies them only when the collection is first
+    # created; an existing collection keeps the space it was built with (L2
+    # before this setting), see _check_distance_space.
+    # Embeddings are L2-normalized, so cosine ranks the same as L2; the scores
+    # returned are cosine distances in [0, 2], lower is better. (Chroma's local
+    # HNSW index stores float32 only; there is no int8/PQ option to enable.)
+    COLLECTION_METADATA = {"hnsw:space": "cosine"}
+
+    # Set after the embedder's first successful probe (see _verify_embedder)
+    _verified = False
+    # Set once the collection's distance space has been checked
+    _space_checked = False
+    _dim: Optional[int] = None
+
     def __init__(self):
         self.persist_directory = Config.CHROMA_DB_DIR
         self.embedder = None
         self.embedding_fn = None
+        self.embedding_cache = None
 
     def _init_embedder(self):
         if not self.embedder:
@@ -41,6 +61,11 @@ class ChromaStore:
             except Exception as e:
                 logger.error(f"Failed to initialize Embedder: {e}")
                 raise VectorStoreError("Embedding initialization failed", detail=str(e))
+            try:
+                self.embedding_cache = EmbeddingCache()
+            except Exception as e:
+                # The cache only saves work; ingestion still embeds everything without it
+                logger.warning(f"Embedding cache unavailable, embedding every chunk: {e}")
 
     def get_vectorstore(self) -> Chroma:
         """Returns the Chroma vector store instance."""
@@ -50,11 +75,30 @@ class ChromaStore:
         # To strictly answer "why load bge", it's because this Code initializes it.
         # We will initialize it lazily.
         self._init_embedder()
-        return Chroma(
+        store = Chroma(
             persist_directory=self.persist_directory,
             embedding_function=self.embedding_fn,
             collection_name="techdoc_collection",
+            collection_metadata=self.COLLECTION_METADATA,
         )
+        self._check_distance_space(store)
+        return store
+
+    @classmethod
+    def _check_distance_space(cls, store: Chroma):
+        """Warns (once) when the collection was created with another distance space."""
+        if cls._space_checked:
+            return
+        cls._space_checked = True
+
+        # Chroma defaults to L2 when no space was given at creation
+        space = (store._collection.metadata or {}).get("hnsw:space", "l2")
+        expected = cls.COLLECTION_METADATA["hnsw:space"]
+        if space != expected:
+            logger.warning(
+                f"Collection uses '{space}' distance, not '{expected}'; vector scores "
+                f"are {space} distances. Reset and re-ingest the DB to switch."
+            )
 
     def add_documents(self, documents: List[Document]):
         """
@@ -71,12 +115,8 @@ class ChromaStore:
                 os.makedirs(self.persist_directory, exist_ok=True)
                 logger.info(f"Created ChromaDB directory: {self.persist_directory}")
 
-            # Test embedder with first chunk to verify it works
             self._init_embedder()
-            test_vector = self.embedder.embed_query("test")
-            if not test_vector or len(test_vector) == 0:
-                raise VectorStoreError("Embedder produced empty vector", detail="")
-            logger.debug(f"Embedding dimension verified: {len(test_vector)}")
+            self._verify_embedder()
 
             # Generate unique IDs based on content + source for deduplication
             ids = [
@@ -86,15 +126,23 @@ class ChromaStore:
 
             store = self.get_vectorstore()
 
-            # Check for duplicates before adding
-            existing_ids = set(store.get()["ids"] or [])
+            # Check for duplicates before adding (only look up this batch's IDs;
+            # an empty collection can't contain any, so skip the lookup)
+            if store._collection.count() == 0:
+                existing_ids = set()
+            else:
+                existing_ids = set(store._collection.get(ids=ids, include=[])["ids"])
             new_docs = []
             new_ids = []
 
             for doc, doc_id in zip(documents, ids):
+                # Stored with the chunk so retrieval can key on it without rehashing text
+                doc.metadata["chunk_id"] = doc_id
                 if doc_id not in existing_ids:
                     new_docs.append(doc)
                     new_ids.append(doc_id)
+                    # IDs are content-derived, so repeats within a batch collide too
+                    existing_ids.add(doc_id)
                 else:
                     logger.warning(f"Skipping duplicate document: {doc_id}")
 
@@ -106,12 +154,19 @@ class ChromaStore:
                 f"Adding {len(new_docs)} documents to ChromaDB at {self.persist_directory}..."
             )
 
-            # Add in batches to avoid overwhelming ChromaDB
-            batch_size = 100
+            # Embed in large batches ourselves and write straight to the collection,
+            # so the LangChain wrapper doesn't re-embed in small slices
+            batch_size = self.ADD_BATCH_SIZE
             for i in range(0, len(new_docs), batch_size):
                 batch_docs = new_docs[i : i + batch_size]
                 batch_ids = new_ids[i : i + batch_size]
-                store.add_documents(documents=batch_docs, ids=batch_ids)
+                batch_texts = [doc.page_content for doc in batch_docs]
+                store._collection.add(
+                    ids=batch_ids,
+                    embeddings=self._embed(batch_texts),
+                    documents=batch_texts,
+                    metadatas=[doc.metadata for doc in batch_docs],
+                )
                 logger.debug(f"Added batch {i//batch_size + 1}: {len(batch_docs)} docs")
 
             logger.info(
@@ -122,19 +177,54 @@ class ChromaStore:
             logger.error(f"Failed to add documents to ChromaDB: {e}")
             raise VectorStoreError("Failed to add documents", detail=str(e))
 
-    def _generate_id(self, content: str, source: str) -> str:
-        """Generates a stable hash ID using SHA256 instead of MD5."""
-        import time
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embeds texts, reusing cached vectors and embedding only the misses."""
+        if self.embedding_cache is None:
+            return self.embedder.encode(texts)
+
+        model_id = self.embedder.get_model_id()
+        vectors = self.embedding_cache.get(texts, model_id)
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            miss_texts = [texts[i] for i in misses]
+            new_vectors = self.embedder.encode(miss_texts)
+            self.embedding_cache.put(miss_texts, model_id, new_vectors)
+            for i, vector in zip(misses, new_vectors):
+                vectors[i] = vector
+        logger.debug(f"Embedding cache: {len(texts) - len(misses)}/{len(texts)} hits")
+        return np.stack(vectors)
 
-        # Add timestamp to prevent exact duplicates of same content
-        composite = f"{source}_{content}_{time.time()}"
-        return hashlib.sha256(composite.encode("utf-8")).hexdigest()[:16]
+    def _verify_embedder(self):
+        """
+        Smoke-tests the embedder once per store (one inference pass) and
+        caches the embedding dimension.
+        """
+        if self._verified:
+            return
+
+        test_vector = self.embedder.embed_query("test")
+        if not test_vector or len(test_vector) == 0:
+            raise VectorStoreError("Embedder produced empty vector", detail="")
+
+        self._dim = len(test_vector)
+        self._verified = True
+        logger.debug(f"Embedding dimension verified: {self._dim}")
+
+    def _generate_id(self, content: str, source: str) -> str:
+        """
+        Generates a stable 64-bit hash ID (BLAKE2b) from source + content.
+        Deterministic, so re-ingesting the same chunk is caught by dedup.
+        """
+        composite = source.encode("utf-8") + b"\0" + content.encode("utf-8")
+        return hashlib.blake2b(composite, digest_size=8).hexdigest()
 
     def reset_db(self):
         """Clears the DB."""
         if os.path.exists(self.persist_directory):
             try:
                 shutil.rmtree(self.persist_directory)
+                # The next collection is created with COLLECTION_METADATA
+                ChromaStore._space_checked = False
                 logger.info("Vector database cleared.")
             except Exception as e:
                 logger.error(f"Failed to clear DB: {e}")
@@ -158,8 +248,11 @@ class ChromaStore:
                 print(f"ID: {data['ids'][i]}")
                 print(f"Metadata: {data['metadatas'][i]}")
                 print(f"Content: {data['documents'][i][:50]}...")
-                if data["embeddings"]:
-                    print(f"Vector: Present (Dim: {len(data['embeddings'][i])})")
+                if data["embeddings"] is not None and len(data["embeddings"]):
+                    dim = len(data["embeddings"][i])
+                    print(f"Vector: Present (Dim: {dim})")
+                    if self._dim is not None and dim != self._dim:
+                        print(f"WARNING: embedder dimension is {self._dim}")
                 else:
                     print("Vector: MISSING!")
                 print("-" * 20)
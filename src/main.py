@@ -1,8 +1,10 @@
+import os
+
 import uvicorn
 from fastapi import FastAPI
-from src.api.routes import router as api_router
+from src.api.routes import router as api_router, lifespan
 
-app = FastAPI(title="TechDocAI API")
+app = FastAPI(title="TechDocAI API", lifespan=lifespan)
 
 app.include_router(api_router, prefix="/api")
 
@@ -11,4 +13,15 @@ def root():
     return {"status": "TechDocAI is Online"}
 
 if __name__ == "__main__":
-    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True)
+    # Each worker is a separate process with its own models, BM25 index and
+    # ingest-job registry, so scale out with WORKERS only when that's acceptable.
+    # loop/http "auto" pick uvloop + httptools when installed (uvicorn[standard]).
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="auto",
+        http="auto",
+        reload=os.getenv("RELOAD", "0") == "1",
+    )
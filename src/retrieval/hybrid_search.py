@@ -1,8 +1,17 @@
-from typing import List, Tuple, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple, Dict, Any
 import hashlib
+import logging
+import pickle
 import re
+import shutil
+import string
+import threading
 
-from rank_bm25 import BM25Okapi
+import bm25s
+import numpy as np
 from langchain_core.documents import Document
 
 import os
@@ -10,17 +19,33 @@ import sys
 
 # Ensure imports work
 try:
+    from src.config import Config
     from src.ingestion.vector_store import ChromaStore
     from src.utils.logging import get_logger
     from src.utils.exception import RetrievalError
+    from src.utils.workers import get_worker_context
 except ModuleNotFoundError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.config import Config
     from src.ingestion.vector_store import ChromaStore
     from src.utils.logging import get_logger
     from src.utils.exception import RetrievalError
+    from src.utils.workers import get_worker_context
 
 logger = get_logger(__name__)
 
+# BM25 tokens: lowercase alphanumeric runs of 3+ chars (the length filter lives
+# in the regex, so tokenizing needs no per-token Python work)
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+# ASCII fast path for the same tokens: every non-alphanumeric maps to a space
+_KEEP = frozenset(string.ascii_lowercase + string.digits)
+_TRANS = str.maketrans({c: " " for c in map(chr, range(128)) if c not in _KEEP})
+# Joins documents into one buffer for bulk lowercasing (normally stripped by
+# TextCleaner; _tokenize_corpus falls back to per-document lowercasing if not)
+_DOC_SEP = "\x00"
+# Bumped whenever the persisted BM25 cache layout changes, so old caches are rebuilt
+_BM25_CACHE_FORMAT = 3
+
 
 class HybridSearch:
     """
@@ -28,32 +53,84 @@ class HybridSearch:
     Flow: BM25 Search + Vector Search → RRF Fusion → Top-K Results
     """
 
+    # Recent (query, k) -> fused results, for repeated queries (retries, re-renders)
+    QUERY_CACHE_SIZE = 256
+    # Corpora larger than this are tokenized across worker processes. Tokenizing
+    # costs ~40 us/doc, and unpickling the token lists back in this process
+    # alone ~11 us/doc, on top of starting the workers, so smaller corpora are
+    # faster on one core
+    PARALLEL_TOKENIZE_MIN_DOCS = 50_000
+    # Documents per task sent to a tokenizer worker
+    TOKENIZE_CHUNK_SIZE = 256
+    # Pickled docs_map, stored next to the bm25s index files
+    _DOCS_FILE = "docs.pkl"
+    # Persisted index generations kept on disk (the current one and the one
+    # before it), since other workers may still have the older one memory-mapped
+    BM25_CACHE_GENERATIONS = 2
+    # RRF constant and its precomputed 1 / (c + rank) table (rank is 0-based)
+    RRF_C = 60
+    _RRF_WEIGHTS: np.ndarray = 1.0 / (RRF_C + np.arange(256))
+
     def __init__(self):
         try:
             self.store = ChromaStore()
             self.vectorstore = self.store.get_vectorstore()
             self.bm25_index = None
             self.docs_map = []
+            # Fingerprint of the chunk IDs the current index was built from
+            self._fingerprint: Optional[str] = None
+            # Bumped on every rebuild so callers can detect a stale index
+            self.corpus_version = 0
+            # LRU of search results; searches run on worker threads, hence the lock
+            self._query_cache: OrderedDict = OrderedDict()
+            self._query_cache_lock = threading.Lock()
+            # Runs the BM25 leg while the calling thread queries Chroma; one
+            # thread per core matches the API's CPU concurrency limit
+            self._pool = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix="bm25"
+            )
 
-            # Initialize BM25 Index from ChromaDB
+            # Initialize BM25 Index from ChromaDB (built once, reused per query)
             self.build_bm25()
             logger.info("HybridSearch initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize HybridSearch: {e}")
+            logger.error("Failed to initialize HybridSearch: %s", e)
             raise RetrievalError("Hybrid Search Init Failed", detail=str(e))
 
-    def refresh(self):
-        """Refreshes the BM25 index after new documents are ingested."""
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Refreshes the BM25 index after new documents are ingested.
+        The current index is kept when the collection holds exactly the same
+        chunk IDs (e.g. an upload that only contained duplicates); any add,
+        delete or edit changes the ID fingerprint.
+        Returns True when the index was rebuilt or reloaded.
+        """
+        if not force and self.bm25_index is not None:
+            ids = self.vectorstore._collection.get(include=[])["ids"]
+            if self._corpus_fingerprint(ids) == self._fingerprint:
+                logger.info("Corpus unchanged, reusing cached BM25 index")
+                return False
+
         logger.info("Refreshing Hybrid Search Index...")
-        self.build_bm25()
+        # Cached results are keyed by corpus version too, this just frees them early
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        self.build_bm25(use_cache=not force)
+        return True
 
-    def build_bm25(self):
+    def build_bm25(self, use_cache: bool = True):
         """
         Builds BM25 index from all documents in ChromaDB.
         BM25 = Keyword-based ranking algorithm.
+        The index is persisted to disk and reused across restarts until
+        new documents are ingested.
         """
         logger.info("Building BM25 Index from ChromaDB...")
         try:
+            # Reuse the persisted index when the collection holds the same chunks
+            if use_cache and self._load_bm25_cache():
+                return
+
             # Fetch all documents from ChromaDB
             data = self.vectorstore.get(include=["metadatas", "documents"])
 
@@ -61,43 +138,174 @@ class HybridSearch:
                 logger.warning("ChromaDB is empty. BM25 index will be empty.")
                 self.bm25_index = None
                 self.docs_map = []
+                self._fingerprint = None
                 return
 
-            # Reconstruct Document objects for BM25
-            self.docs_map = [
-                Document(page_content=text, metadata=meta)
-                for text, meta in zip(data["documents"], data["metadatas"])
+            # Reconstruct Document objects for BM25 (with their Chroma IDs, which
+            # vector search results carry too, so fusion can key on them)
+            docs_map = [
+                Document(id=doc_id, page_content=text, metadata=meta)
+                for doc_id, text, meta in zip(
+                    data["ids"], data["documents"], data["metadatas"]
+                )
             ]
 
             # Tokenize documents for BM25
-            tokenized_corpus = [
-                self._tokenize(doc.page_content) for doc in self.docs_map
-            ]
-
-            # Build BM25 index
-            self.bm25_index = BM25Okapi(tokenized_corpus)
+            if (
+                len(data["documents"]) > self.PARALLEL_TOKENIZE_MIN_DOCS
+                and (os.cpu_count() or 1) > 1
+            ):
+                tokenized_corpus = self._tokenize_corpus_parallel(data["documents"])
+            else:
+                tokenized_corpus = self._tokenize_corpus(data["documents"])
+
+            # Build BM25 index (sparse score matrix). "auto" scores with the
+            # numba-JIT backend when numba is installed, vectorized NumPy otherwise.
+            # Scores and token IDs are kept 32-bit to halve the bytes read per query
+            bm25_index = bm25s.BM25(backend="auto", dtype="float32", int_dtype="int32")
+            bm25_index.index(tokenized_corpus, show_progress=False)
+
+            # Swap in together so concurrent searches see a matching pair
+            self.bm25_index, self.docs_map = bm25_index, docs_map
+            self._fingerprint = self._corpus_fingerprint(data["ids"])
+            self.corpus_version += 1
             logger.info(
-                f"BM25 Index built successfully with {len(self.docs_map)} documents"
+                "BM25 Index built successfully with %s documents", len(self.docs_map)
             )
+            self._save_bm25_cache(self._fingerprint)
 
         except Exception as e:
-            logger.error(f"Failed to build BM25 index: {e}")
+            logger.error("Failed to build BM25 index: %s", e)
             self.bm25_index = None
 
-    def _tokenize(self, text: str) -> List[str]:
+    @staticmethod
+    def _corpus_fingerprint(ids: List[str]) -> str:
+        """Order-independent hash of the collection's chunk IDs (and cache layout)."""
+        digest = hashlib.blake2b(f"{_BM25_CACHE_FORMAT}".encode(), digest_size=16)
+        for doc_id in sorted(ids):
+            digest.update(b"\0" + doc_id.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_bm25_cache(self) -> bool:
+        """
+        Loads the persisted BM25 index saved for the current collection contents.
+        Score arrays are memory-mapped rather than read into memory.
+        Returns False when no index matches the collection's fingerprint.
+        """
+        ids = self.vectorstore._collection.get(include=[])["ids"]
+        if not ids:
+            return False
+        fingerprint = self._corpus_fingerprint(ids)
+        cache_dir = os.path.join(Config.BM25_CACHE_DIR, fingerprint)
+        if not os.path.isdir(cache_dir):
+            return False
+
+        try:
+            bm25_index = bm25s.BM25.load(
+                cache_dir, mmap=True, backend="auto", show_progress=False
+            )
+            with open(os.path.join(cache_dir, self._DOCS_FILE), "rb") as f:
+                docs_map = pickle.load(f)
+        except Exception as e:
+            logger.warning("Ignoring unreadable BM25 cache: %s", e)
+            return False
+
+        self.bm25_index, self.docs_map = bm25_index, docs_map
+        self._fingerprint = fingerprint
+        self.corpus_version += 1
+        logger.info("BM25 Index loaded from cache with %s documents", len(docs_map))
+        return True
+
+    def _save_bm25_cache(self, fingerprint: str):
+        """
+        Persists the BM25 index under its corpus fingerprint (written to a temp
+        directory, then renamed) and removes indexes older than the last
+        BM25_CACHE_GENERATIONS.
+        """
+        cache_dir = os.path.join(Config.BM25_CACHE_DIR, fingerprint)
+        tmp_dir = f"{cache_dir}.tmp{os.getpid()}"
+        try:
+            if os.path.isdir(cache_dir):
+                return
+            self.bm25_index.save(tmp_dir, show_progress=False)
+            with open(os.path.join(tmp_dir, self._DOCS_FILE), "wb") as f:
+                pickle.dump(self.docs_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_dir, cache_dir)
+        except Exception as e:
+            logger.warning("Failed to persist BM25 index: %s", e)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        # Newest first by write time; the index just saved is always the newest
+        try:
+            generations = sorted(
+                (
+                    os.path.join(Config.BM25_CACHE_DIR, entry)
+                    for entry in os.listdir(Config.BM25_CACHE_DIR)
+                    if ".tmp" not in entry
+                ),
+                key=os.path.getmtime,
+                reverse=True,
+            )
+        except OSError as e:
+            # Another worker pruned concurrently; leave the cleanup to it
+            logger.debug("Skipping BM25 cache cleanup: %s", e)
+            return
+        for path in generations[self.BM25_CACHE_GENERATIONS :]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _tokenize(text: str) -> List[str]:
         """
         Tokenizes text for BM25.
         Removes punctuation, converts to lowercase, filters short tokens.
+        Memoized for repeated queries; callers must not mutate the result.
         """
-        # Convert to lowercase
+        # Lowercase, keep alphanumeric runs, drop very short tokens (<= 2 chars)
         text = text.lower()
-        # Remove punctuation and special characters
-        text = re.sub(r"[^a-z0-9\s]", " ", text)
-        # Split by whitespace
-        tokens = text.split()
-        # Filter out very short tokens (< 2 chars)
-        tokens = [t for t in tokens if len(t) > 2]
-        return tokens
+        if text.isascii():
+            # A translate table beats the regex scan on plain ASCII
+            return [tok for tok in text.translate(_TRANS).split() if len(tok) > 2]
+        return _TOKEN_RE.findall(text)
+
+    @staticmethod
+    def _tokenize_corpus(texts: List[str]) -> List[List[str]]:
+        """
+        Same tokens as _tokenize, for a whole corpus: lowercases every document
+        in one call over a single joined buffer, then tokenizes each document.
+        """
+        lowered = _DOC_SEP.join(texts).lower().split(_DOC_SEP)
+        if len(lowered) != len(texts):
+            # A document contains the separator; lowercase one by one so token
+            # lists stay aligned with docs_map
+            lowered = [text.lower() for text in texts]
+        return [
+            [tok for tok in text.translate(_TRANS).split() if len(tok) > 2]
+            if text.isascii()
+            else _TOKEN_RE.findall(text)
+            for text in lowered
+        ]
+
+    @classmethod
+    def _tokenize_corpus_parallel(cls, texts: List[str]) -> List[List[str]]:
+        """
+        _tokenize_corpus spread over one worker process per core, in chunks of
+        TOKENIZE_CHUNK_SIZE documents. Results keep the input order.
+        """
+        chunks = [
+            texts[i : i + cls.TOKENIZE_CHUNK_SIZE]
+            for i in range(0, len(texts), cls.TOKENIZE_CHUNK_SIZE)
+        ]
+        logger.info("Tokenizing %s documents in %s parallel chunks", len(texts), len(chunks))
+        with ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1, mp_context=get_worker_context()
+        ) as executor:
+            return [
+                tokens
+                for chunk_tokens in executor.map(cls._tokenize_corpus, chunks)
+                for tokens in chunk_tokens
+            ]
 
     def search(self, query: str, k: int = 5) -> List[Tuple[Document, Dict[str, Any]]]:
         """
@@ -114,55 +322,206 @@ class HybridSearch:
         Returns:
             List of (Document, metadata) tuples with scores
         """
-        logger.info(f"Hybrid search query: '{query}'")
+        cached = self._get_cached_results(query, k)
+        if cached is not None:
+            return cached
+
+        try:
+            query_embedding = self.store.embedder.embed_query(query)
+        except Exception as e:
+            logger.error("Query embedding failed: %s", e)
+            raise RetrievalError(f"Search failed for query '{query}'", detail=str(e))
+
+        return self.search_with_embedding(query_embedding, query, k=k)
+
+    def search_with_embedding(
+        self, query_embedding: List[float], query: str, k: int = 5
+    ) -> List[Tuple[Document, Dict[str, Any]]]:
+        """
+        Same as search(), but with a precomputed query embedding so callers
+        that already embedded the question don't encode it again.
+
+        Args:
+            query_embedding: Normalized embedding of the query
+            query: Raw query string (used for BM25)
+            k: Number of top results to return
+
+        Returns:
+            List of (Document, metadata) tuples with scores
+        """
+        logger.info("Hybrid search query: '%s'", query)
+
+        cached = self._get_cached_results(query, k)
+        if cached is not None:
+            return cached
+        corpus_version = self.corpus_version
 
         try:
-            # 1. Vector Search (Semantic similarity via embeddings)
+            # 1 & 2. BM25 Search (Keyword matching) on the pool, concurrently with
+            # Vector Search (Semantic similarity via embeddings) on this thread
+            tokenized_query = self._tokenize(query)
+            bm25_future = self._pool.submit(self._bm25_search, tokenized_query, k * 2)
+
             logger.debug("Running vector search...")
-            vec_results = self.vectorstore.similarity_search_with_score(query, k=k * 2)
-            logger.debug(f"Vector search: {len(vec_results)} results")
-
-            # 2. BM25 Search (Keyword matching)
-            logger.debug("Running BM25 search...")
-            bm25_results = []
-            if self.bm25_index and self.docs_map:
-                tokenized_query = self._tokenize(query)
-                bm25_results = self.bm25_index.get_top_n(
-                    tokenized_query, self.docs_map, n=k * 2
-                )
-                logger.debug(f"BM25 search: {len(bm25_results)} results")
-            else:
-                logger.warning("BM25 index unavailable, using vector search only")
+            vec_results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                query_embedding, k=k * 2
+            )
+            logger.debug("Vector search: %s results", len(vec_results))
+
+            bm25_results = bm25_future.result()
 
             # 3 & 4. RRF Fusion & Return Top-K
-            if not bm25_results:
-                # Fallback: vector search only
-                fused_results = [
-                    (doc, {"source": "vector_only", "score": score})
-                    for doc, score in vec_results[:k]
-                ]
-                logger.info(
-                    f"Returned {len(fused_results)} results (vector search only)"
-                )
-            else:
-                # Full hybrid fusion
-                fused_results = self._rrf_fusion(vec_results, bm25_results, k=k)
-                logger.info(
-                    f"Hybrid fusion complete. Returning {len(fused_results)} results"
-                )
+            fused_results = self._fuse(vec_results, bm25_results, k)
+
+            cached = self._copy_results(fused_results)
+            with self._query_cache_lock:
+                self._query_cache[(query, k, corpus_version)] = cached
+                if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
 
             return fused_results
 
         except Exception as e:
-            logger.error(f"Search failed: {e}")
+            logger.error("Search failed: %s", e)
             raise RetrievalError(f"Search failed for query '{query}'", detail=str(e))
 
+    def search_many(
+        self, queries: List[str], k: int = 5
+    ) -> List[List[Tuple[Document, Dict[str, Any]]]]:
+        """
+        Batched search() for offline evaluation: embeds all queries in one
+        encode call, scores all BM25 queries in one retrieve call, and runs the
+        vector queries on the thread pool. Bypasses the per-query result cache.
+
+        Args:
+            queries: Search query strings
+            k: Number of top results to return per query
+
+        Returns:
+            One list of (Document, metadata) tuples per query, in input order
+        """
+        if not queries:
+            return []
+
+        logger.info("Hybrid search batch: %s queries", len(queries))
+        try:
+            query_embeddings = self.store.embedder.encode(queries)
+            bm25_future = self._pool.submit(
+                self._bm25_search_many, [self._tokenize(q) for q in queries], k * 2
+            )
+
+            all_vec_results = list(
+                self._pool.map(
+                    lambda emb: self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                        emb.tolist(), k=k * 2
+                    ),
+                    query_embeddings,
+                )
+            )
+            all_bm25_results = bm25_future.result()
+
+            return [
+                self._fuse(vec_results, bm25_results, k)
+                for vec_results, bm25_results in zip(all_vec_results, all_bm25_results)
+            ]
+        except Exception as e:
+            logger.error("Batch search failed: %s", e)
+            raise RetrievalError("Batch search failed", detail=str(e))
+
+    def _fuse(
+        self,
+        vec_results: List[Tuple[Document, float]],
+        bm25_results: List[Document],
+        k: int,
+    ) -> List[Tuple[Document, Dict[str, Any]]]:
+        """RRF-fuses both result lists, or falls back to vector results alone."""
+        if not bm25_results:
+            # Fallback: vector search only
+            fused_results = [
+                (doc, {"source": "vector_only", "score": score})
+                for doc, score in vec_results[:k]
+            ]
+            logger.info("Returned %s results (vector search only)", len(fused_results))
+        else:
+            # Full hybrid fusion
+            fused_results = self._rrf_fusion(vec_results, bm25_results, k=k)
+            logger.info("Hybrid fusion complete. Returning %s results", len(fused_results))
+        return fused_results
+
+    def _bm25_search(self, tokenized_query: List[str], n: int) -> List[Document]:
+        """Top-n BM25 documents for a tokenized query (empty when nothing matches)."""
+        return self._bm25_search_many([tokenized_query], n)[0]
+
+    def _bm25_search_many(
+        self, tokenized_queries: List[List[str]], n: int
+    ) -> List[List[Document]]:
+        """Top-n BM25 documents per tokenized query, scored in one retrieve call."""
+        # Snapshot both, since refresh() may swap them while this runs
+        bm25_index, docs_map = self.bm25_index, self.docs_map
+        if bm25_index is None or not docs_map:
+            logger.warning("BM25 index unavailable, using vector search only")
+            return [[] for _ in tokenized_queries]
+        if not any(tokenized_queries):
+            return [[] for _ in tokenized_queries]
+
+        logger.debug("Running BM25 search...")
+        # bm25s rejects k larger than the corpus
+        doc_ids, doc_scores = bm25_index.retrieve(
+            [list(tokens) for tokens in tokenized_queries],
+            k=min(n, len(docs_map)),
+            show_progress=False,
+        )
+        # Zero score = no query term matched; leave those to vector search
+        results = [
+            [docs_map[i] for i, score in zip(ids, scores) if score > 0]
+            for ids, scores in zip(doc_ids, doc_scores)
+        ]
+        logger.debug("BM25 search: %s results", sum(map(len, results)))
+        return results
+
+    def _get_cached_results(
+        self, query: str, k: int
+    ) -> Optional[List[Tuple[Document, Dict[str, Any]]]]:
+        """Returns a copy of the cached results for (query, k) on the current corpus."""
+        key = (query, k, self.corpus_version)
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is None:
+                return None
+            self._query_cache.move_to_end(key)
+
+        logger.info("Query cache hit: '%s'", query)
+        return self._copy_results(cached)
+
+    @staticmethod
+    def _copy_results(
+        results: List[Tuple[Document, Dict[str, Any]]]
+    ) -> List[Tuple[Document, Dict[str, Any]]]:
+        """
+        Copies results down to each Document's metadata and the score info, so
+        callers that annotate or rerank results never modify the cached entry.
+        """
+        return [
+            (
+                Document(id=doc.id, page_content=doc.page_content, metadata=dict(doc.metadata)),
+                {**info, "sources": list(info.get("sources", []))},
+            )
+            for doc, info in results
+        ]
+
+    @classmethod
+    def _rrf_weights(cls, n: int, c: int) -> np.ndarray:
+        """1 / (c + rank) for ranks 0..n-1, from the shared table when it covers them."""
+        if c == cls.RRF_C and n <= len(cls._RRF_WEIGHTS):
+            return cls._RRF_WEIGHTS
+        return 1.0 / (c + np.arange(n))
+
     def _rrf_fusion(
         self,
         vec_results: List[Tuple[Document, float]],
         bm25_results: List[Document],
         k: int,
-        c: int = 60,
+        c: int = RRF_C,
     ) -> List[Tuple[Document, Dict[str, Any]]]:
         """
         Reciprocal Rank Fusion (RRF) combines vector & BM25 results.
@@ -180,53 +539,86 @@ class HybridSearch:
         Returns:
             Top k documents with fusion scores
         """
-        scores: Dict[str, float] = {}
-        doc_lookup: Dict[str, Tuple[Document, Dict]] = {}
+        # Map each unique document to a dense position, so scoring is array math
+        positions: Dict[str, int] = {}
+        doc_lookup: List[Tuple[Document, Dict[str, Any]]] = []
 
         def get_doc_key(doc: Document) -> str:
-            """Generate unique key for document using content hash."""
-            return hashlib.md5(doc.page_content.encode()).hexdigest()
+            """Chroma ID (set on vector hits and BM25 docs); content hash as a last resort."""
+            return (
+                doc.id
+                or doc.metadata.get("chunk_id")
+                or hashlib.blake2b(doc.page_content.encode(), digest_size=8).hexdigest()
+            )
 
-        # Process Vector Search Results
-        logger.debug("Processing vector search results...")
+        # Checked once: the per-document debug line below runs on every query
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Process Vector Search Results (scores are Chroma distances: cosine,
+        # in [0, 2], lower is better)
+        vec_pos = np.empty(len(vec_results), dtype=np.intp)
         for rank, (doc, sim_score) in enumerate(vec_results):
             key = get_doc_key(doc)
-            doc_lookup[key] = (
-                doc,
-                {
-                    "vector_score": float(sim_score),
-                    "vector_rank": rank + 1,
-                    "sources": ["vector"],
-                },
-            )
-            scores[key] = scores.get(key, 0) + (1 / (c + rank))
+            pos = positions.get(key)
+            if pos is None:
+                pos = positions[key] = len(doc_lookup)
+                doc_lookup.append(
+                    (
+                        doc,
+                        {
+                            "vector_score": float(sim_score),
+                            "vector_rank": rank + 1,
+                            "sources": ["vector"],
+                        },
+                    )
+                )
+            vec_pos[rank] = pos
 
         # Process BM25 Search Results
-        logger.debug("Processing BM25 search results...")
+        bm25_pos = np.empty(len(bm25_results), dtype=np.intp)
         for rank, doc in enumerate(bm25_results):
             key = get_doc_key(doc)
+            pos = positions.get(key)
 
-            if key in doc_lookup:
+            if pos is not None:
                 # Document appears in both searches - boost score
-                doc_lookup[key][1]["bm25_rank"] = rank + 1
-                doc_lookup[key][1]["sources"].append("bm25")
-                logger.debug(
-                    f"Found in both searches (vector_rank={doc_lookup[key][1]['vector_rank']}, bm25_rank={rank+1})"
-                )
+                info = doc_lookup[pos][1]
+                info["bm25_rank"] = rank + 1
+                info["sources"].append("bm25")
+                if debug:
+                    logger.debug(
+                        "Found in both searches (vector_rank=%s, bm25_rank=%s)",
+                        info.get("vector_rank"),
+                        rank + 1,
+                    )
             else:
                 # Document only in BM25
-                doc_lookup[key] = (doc, {"bm25_rank": rank + 1, "sources": ["bm25"]})
-
-            scores[key] = scores.get(key, 0) + (1 / (c + rank))
-
-        # Sort by RRF Score (descending)
-        sorted_keys = sorted(scores.keys(), key=scores.get, reverse=True)
+                pos = positions[key] = len(doc_lookup)
+                doc_lookup.append((doc, {"bm25_rank": rank + 1, "sources": ["bm25"]}))
+
+            bm25_pos[rank] = pos
+
+        # RRF scores: one vectorized 1 / (c + rank) scatter-add per result list
+        weights = self._rrf_weights(max(len(vec_pos), len(bm25_pos)), c)
+        scores = np.zeros(len(doc_lookup))
+        np.add.at(scores, vec_pos, weights[: len(vec_pos)])
+        np.add.at(scores, bm25_pos, weights[: len(bm25_pos)])
+
+        # Top K by RRF score (descending, ties in first-seen order) via an O(n)
+        # partition; ties at the cut-off keep the earliest positions
+        top = np.arange(len(scores))
+        if k < len(scores):
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)[: k - len(above)]
+            top = np.concatenate((above, tied))
+        top = top[np.lexsort((top, -scores[top]))]
 
         # Return Top K with metadata
         fused_results = []
-        for key in sorted_keys[:k]:
-            doc, metadata = doc_lookup[key]
-            metadata["rrf_score"] = scores[key]
+        for pos in top:
+            doc, metadata = doc_lookup[pos]
+            metadata["rrf_score"] = float(scores[pos])
             fused_results.append((doc, metadata))
 
         return fused_results
@@ -267,5 +659,5 @@ if __name__ == "__main__":
         print(f"{'='*60}")
 
     except Exception as e:
-        logger.error(f"Test failed: {e}")
+        logger.error("Test failed: %s", e)
         print(f"Error: {e}")
@@ -1,16 +1,36 @@
 from typing import List
+import numpy as np
+import torch
 from sentence_transformers import CrossEncoder
 from langchain_core.documents import Document
 from src.config import Config
 
 class Reranker:
+    # All (query, doc) pairs of a request go through a single predict call
+    BATCH_SIZE = 64
+
     def __init__(self):
         # Load model once
-        self.model = CrossEncoder(Config.CROSS_ENCODER_MODEL)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = CrossEncoder(Config.CROSS_ENCODER_MODEL, device=self.device)
+        if self.device == "cuda":
+            # FP16 roughly halves cross-encoder latency on tensor cores
+            self.model.model.half()
 
     def rerank(self, query: str, documents: List[Document], top_n: int = 5) -> List[Document]:
         if not documents: return []
         pairs = [[query, doc.page_content] for doc in documents]
-        scores = self.model.predict(pairs)
-        ranked = sorted(zip(documents, scores), key=lambda x: x[1], reverse=True)
-        return [doc for doc, _ in ranked[:top_n]]
+        with torch.inference_mode():
+            scores = self.model.predict(
+                pairs,
+                batch_size=self.BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        # O(n) partition for the top_n, then sort only those (ties keep input order)
+        if top_n < len(scores):
+            top_idx = np.sort(np.argpartition(-scores, top_n - 1)[:top_n])
+        else:
+            top_idx = np.arange(len(scores))
+        top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
+        return [documents[i] for i in top_idx]
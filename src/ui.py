@@ -2,12 +2,30 @@ import streamlit as st
 import requests
 import json
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Constants
 API_URL = "http://localhost:8000/api"
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    Keep-alive HTTP session to the API, shared across reruns (Streamlit
+    re-executes this script on every interaction).
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    ))
+    return session
+
 st.set_page_config(page_title="TechDocAI Workbench", layout="wide", page_icon="🤖")
 
+session = get_session()
+
 st.title("🤖 TechDocAI Verification Workbench")
 st.markdown("Use this interface to verify the **Ingestion Pipeline** and **Hybrid Search** logic.")
 
@@ -32,11 +50,11 @@ with st.sidebar:
             with st.spinner("Uploading & Processing..."):
                 try:
                     files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
-                    res = requests.post(f"{API_URL}/ingest/", files=files)
+                    res = session.post(f"{API_URL}/ingest/", files=files)
                     
-                    if res.status_code == 200:
+                    if res.status_code in (200, 202):
                         data = res.json()
-                        st.success("✅ Ingestion Successful!")
+                        st.success("✅ Ingestion Started! Processing runs in the background.")
                         st.json(data)
                     else:
                         st.error(f"❌ Error {res.status_code}: {res.text}")
@@ -45,6 +63,16 @@ with st.sidebar:
 
     st.markdown("---")
     st.header("⚙️ Database Controls")
+    # The API process holds the search index, so refresh it there
+    if st.button("🔄 Refresh Index"):
+        try:
+            res = session.post(f"{API_URL}/refresh/")
+            if res.status_code == 200:
+                st.success(f"✅ Index refreshed ({res.json()['documents']} chunks)")
+            else:
+                st.error(f"❌ Error {res.status_code}: {res.text}")
+        except Exception as e:
+            st.error(f"Connection Failed: {e}")
     if st.button("🗑️ Reset Database (DANGER)"):
         st.warning("Feature not connected to API yet for safety.")
 
@@ -59,20 +87,39 @@ with col2:
 
 if query:
     if st.button("Search") or query:
-        with st.spinner("Searching..."):
-            try:
-                payload = {"question": query, "k": k_val}
-                res = requests.post(f"{API_URL}/search/", json=payload)
-                
+        try:
+            payload = {"question": query, "k": k_val}
+            sources = {}
+
+            def stream_answer(res):
+                """Yields answer tokens from the SSE stream; stashes the sources event."""
+                event = None
+                for line in res.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        data = json.loads(line[len("data: "):])
+                        if event == "sources":
+                            sources.update(data)
+                        elif event == "error":
+                            raise RuntimeError(data)
+                        elif event is None:
+                            yield data
+                    elif not line:
+                        event = None
+
+            # Headers (and so the response) arrive once retrieval is done
+            with st.spinner("Searching..."):
+                res = session.post(f"{API_URL}/search/stream/", json=payload, stream=True)
+
+            with res:
                 if res.status_code == 200:
-                    results = res.json()
-                    answer = results.get("answer", "No answer generated.")
-                    hits = results.get("results", [])
-                    
                     st.success("✅ Generated Answer:")
-                    st.markdown(f"### {answer}")
+                    # Tokens render as they arrive instead of after the whole answer
+                    st.write_stream(stream_answer(res))
                     st.markdown("---")
-                    
+
+                    hits = sources.get("results", [])
                     st.subheader(f"📚 Sources ({len(hits)} chunks used)")
                     
                     for i, doc in enumerate(hits):
@@ -84,9 +131,9 @@ if query:
                             st.json(doc['metadata'])
                 else:
                     st.error(f"API Error: {res.text}")
-            except Exception as e:
-                st.error(f"Failed to connect to backend: {e}")
-                st.info("Make sure `src/main.py` is running!")
+        except Exception as e:
+            st.error(f"Failed to connect to backend: {e}")
+            st.info("Make sure `src/main.py` is running!")
 
 st.markdown("---")
 st.caption("TechDocAI Verification UI")
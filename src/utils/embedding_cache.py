@@ -0,0 +1,81 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    from src.config import Config
+    from src.utils.logging import get_logger
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.config import Config
+    from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of chunk embeddings keyed by SHA-256(model_id + text), so
+    re-uploaded content is not embedded again. Backed by a SQLite table in
+    WAL mode; vectors are stored as raw float32 bytes.
+    """
+
+    # Keys per SELECT ... IN (...) query (SQLite caps bound parameters)
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str = str(Config.EMBEDDING_CACHE_PATH)):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Ingestion runs in worker threads, so one shared connection behind a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(hash BLOB PRIMARY KEY, model TEXT NOT NULL, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _key(text: str, model_id: str) -> bytes:
+        return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).digest()
+
+    def get(self, texts: List[str], model_id: str) -> List[Optional[np.ndarray]]:
+        """Returns the cached vector for each text, or None where it is missing."""
+        keys = [self._key(text, model_id) for text in texts]
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[i : i + self.QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    "SELECT hash, vec FROM embeddings WHERE hash IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                )
+                found.update(rows)
+        return [
+            np.frombuffer(found[key], dtype=np.float32) if key in found else None
+            for key in keys
+        ]
+
+    def put(self, texts: List[str], model_id: str, vectors: np.ndarray):
+        """Stores one vector per text (existing entries are overwritten)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [
+            (self._key(text, model_id), model_id, vector.tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model, vec) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        logger.debug(f"Cached {len(rows)} embeddings for {model_id}")
@@ -0,0 +1,22 @@
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+# Modules the fork server imports once up front, so each worker it forks
+# already has them (and their heavy dependencies) loaded
+WORKER_PRELOAD = ["src.ingestion.preprocess", "src.retrieval.hybrid_search"]
+
+
+def get_worker_context() -> BaseContext:
+    """
+    Multiprocessing context for ProcessPoolExecutor workers.
+    The API process runs event-loop and worker threads (and may hold a CUDA
+    context), which a plain fork() would copy in an inconsistent state, so
+    workers are forked from a clean single-threaded fork server instead, or
+    spawned where forkserver is unavailable (Windows).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Only takes effect before the fork server's first start
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
@@ -0,0 +1,126 @@
+import os
+import random
+
+import diskcache
+import pytest
+
+from src.ingestion.preprocess import DomainDetector, FileLoader, Preprocessor, TextCleaner
+
+PYTHON_SOURCE = '''
+import os
+
+
+class Config:
+    """Settings read from the environment."""
+
+    def __init__(self):
+        self.debug = os.getenv("DEBUG", "0") == "1"
+        self.workers = int(os.getenv("WORKERS", "4"))
+        self.data_dir = os.getenv("DATA_DIR", "/tmp/data")
+
+
+def load_items(path):
+    """Reads one item per line, skipping blank lines."""
+    items = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                items.append(line)
+    return items
+
+
+def count_words(items):
+    """Counts words across all items."""
+    total = 0
+    for item in items:
+        total += len(item.split())
+    return total
+
+
+def summarize(path):
+    """Prints a one-line summary of the file at path."""
+    items = load_items(path)
+    print(f"{len(items)} items, {count_words(items)} words")
+'''
+
+
+@pytest.mark.parametrize(
+    "raw, cleaned",
+    [
+        ("mail bob@example.com or call 555-123-4567 now", "mail or call now"),
+        ("docs at https://example.com/guide   and\n\nmore", "docs at and more"),
+        ("null\x00bytes", "nullbytes"),
+        # Overlapping matches: one pass removes the whole URL, where the old
+        # email-then-phone-then-URL chain left a bare "http://" behind
+        ("visit http://user@example.com today", "visit today"),
+        ("call http://5551234567 now", "call now"),
+    ],
+)
+def test_text_cleaner_removes_noise_in_one_pass(raw, cleaned):
+    assert TextCleaner.clean(raw) == cleaned
+
+
+@pytest.fixture
+def loader_cache(tmp_path, monkeypatch):
+    # Keep parsed-file caching out of the repo's data directory
+    monkeypatch.setattr(FileLoader, "_cache", diskcache.Cache(str(tmp_path / "cache")))
+    monkeypatch.setattr(FileLoader, "_cache_pid", os.getpid())
+
+
+def test_code_file_chunks_start_at_definitions(tmp_path, loader_cache):
+    source = tmp_path / "sample.py"
+    source.write_text(PYTHON_SOURCE)
+
+    chunks = Preprocessor().process_file(str(source))
+
+    assert len(chunks) > 1
+    # The first chunk holds the imports; every later one starts a class or function
+    for chunk in chunks[1:]:
+        assert chunk.page_content.startswith(("def ", "class ")), chunk.page_content
+    # Indentation survives cleaning
+    assert "\n    def __init__(self):" in chunks[0].page_content + chunks[1].page_content
+    # Splitter offsets are internal to chunking and not stored
+    assert not any("start_index" in chunk.metadata for chunk in chunks)
+
+
+def _keyword_corpus(n=3000, seed=0):
+    """Random texts mixing keywords with fragments that test boundaries and overlaps."""
+    rng = random.Random(seed)
+    words = list(DomainDetector._KEYWORD_DOMAINS) + [
+        "c++11", "functions", "_def", "rag_", "café", "naïve", "x", "42", "the", "and",
+    ]
+    separators = [" ", " ", " ", "", "-", ".", "\n", "_", "+", "é"]
+    return [
+        "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(1, 12)))
+        for _ in range(n)
+    ]
+
+
+# Optional matcher backends that must agree with the regex fallback
+BACKENDS = {
+    "automaton": (DomainDetector._automaton_counts, DomainDetector._AUTOMATON is not None),
+    "hyperscan": (DomainDetector._hyperscan_counts, DomainDetector._HS_DATABASE is not None),
+}
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_keyword_backends_match_regex(backend):
+    counts, available = BACKENDS[backend]
+    if not available:
+        pytest.skip(f"{backend} backend not installed")
+
+    for text in _keyword_corpus() + [
+        "neural network loss function function",
+        "i love c++ and rust",
+        "c++11 rocks",
+    ]:
+        assert counts(text) == DomainDetector._regex_counts(text), text
+
+
+def test_overlapping_keywords_count_once():
+    # "loss function" is one ML_AI hit; its "function" is not also PROGRAMMING
+    assert DomainDetector._regex_counts("neural network loss function function") == {
+        "ML_AI": 2,
+        "PROGRAMMING": 1,
+    }